@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='activity_user_created_idx'),
+        ),
+    ]
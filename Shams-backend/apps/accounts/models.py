@@ -82,6 +82,9 @@ class UserActivity(models.Model):
         verbose_name = _('user activity')
         verbose_name_plural = _('user activities')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='activity_user_created_idx'),
+        ]
     
     def __str__(self):
         return f'{self.user.email} - {self.activity_type}'
@@ -28,6 +28,7 @@ from datetime import timedelta
 from django.utils import timezone
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework_simplejwt.views import TokenRefreshView
+from core.pagination import CreatedAtCursorPagination
 import os
 
 # Create your views here.
@@ -500,6 +501,7 @@ class FacebookLoginView(generics.GenericAPIView):
 class UserActivityListView(generics.ListAPIView):
     serializer_class = UserActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         return UserActivity.objects.filter(user=self.request.user)
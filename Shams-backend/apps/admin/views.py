@@ -2,7 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.core.cache import cache
+from core.cache import bump_namespace
 from apps.courses.models import Course, Lesson
 from apps.tests.models import Test
 from apps.library.models import Book
@@ -46,7 +46,7 @@ class AdminViewSet(viewsets.ViewSet):
             )
             
             # Cache'ni tozalash
-            cache.delete_pattern('courses:*')
+            bump_namespace('courses')
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -68,7 +68,7 @@ class AdminViewSet(viewsets.ViewSet):
             )
             
             # Cache'ni tozalash
-            cache.delete_pattern('courses:*')
+            bump_namespace('lessons')
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -90,7 +90,7 @@ class AdminViewSet(viewsets.ViewSet):
             )
             
             # Cache'ni tozalash
-            cache.delete_pattern('tests:*')
+            bump_namespace('tests')
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -112,7 +112,7 @@ class AdminViewSet(viewsets.ViewSet):
             )
             
             # Cache'ni tozalash
-            cache.delete_pattern('library:*')
+            bump_namespace('library')
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,137 @@
+"""
+Video pleyer heartbeat'larini buferlash.
+
+Pleyer har bir heartbeat'da bazaga yozmaydi: oxirgi pozitsiya tezkor omborda
+(user_id:lesson_id -> pozitsiya) saqlanadi va flush_heartbeats() uni davriy
+ravishda LessonProgress'ga ommaviy yozadi.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from core.cache import bump_namespace, user_namespace
+from core.kv import get_store
+from .models import Lesson, Enrollment, LessonProgress
+
+POSITIONS_KEY = 'courses:heartbeats:positions'
+COMPLETED_KEY = 'courses:heartbeats:completed'
+
+
+def buffer_heartbeats(user_id, heartbeats):
+    """Heartbeat'larni buferga yozish (bazaga murojaat qilmaydi)"""
+    positions = {}
+    completed = {}
+    for heartbeat in heartbeats:
+        field = f'{user_id}:{heartbeat["lesson_id"]}'
+        positions[field] = heartbeat['position']
+        if heartbeat.get('completed'):
+            completed[field] = 1
+
+    store = get_store()
+    if positions:
+        store.hset(POSITIONS_KEY, positions)
+    # Tugatilganlik alohida saqlanadi, keyingi heartbeat uni o'chirib yubormasligi uchun
+    if completed:
+        store.hset(COMPLETED_KEY, completed)
+    return len(positions)
+
+
+def flush_heartbeats():
+    """Buferdagi pozitsiyalarni LessonProgress'ga yozish"""
+    store = get_store()
+    positions = store.hpopall(POSITIONS_KEY)
+    completed = store.hpopall(COMPLETED_KEY)
+    if not positions and not completed:
+        return 0
+
+    try:
+        return write_heartbeats(positions, completed)
+    except Exception:
+        # Bazaga yozilmadi: buferga qaytaramiz, oraliqda kelgan yangiroq pozitsiyalar ustidan yozmasdan
+        if positions:
+            store.hsetnx(POSITIONS_KEY, positions)
+        if completed:
+            store.hset(COMPLETED_KEY, completed)
+        raise
+
+
+def write_heartbeats(positions, completed):
+    """{user_id:lesson_id: pozitsiya} va tugatilganlarni bazaga yozish"""
+    entries = {}
+    for field in set(positions) | set(completed):
+        user_id, lesson_id = field.split(':', 1)
+        position = positions.get(field)
+        entries[(user_id, lesson_id)] = (
+            int(position) if position is not None else None,
+            field in completed
+        )
+
+    lesson_courses = {
+        str(lesson_id): str(course_id)
+        for lesson_id, course_id in Lesson.objects.filter(
+            id__in={lesson_id for _, lesson_id in entries}
+        ).values_list('id', 'course_id')
+    }
+    enrollments = {
+        (str(user_id), str(course_id)): enrollment_id
+        for enrollment_id, user_id, course_id in Enrollment.objects.filter(
+            user_id__in={user_id for user_id, _ in entries},
+            course_id__in=set(lesson_courses.values())
+        ).values_list('id', 'user_id', 'course_id')
+    }
+
+    # Kursga yozilmagan foydalanuvchilar yoki o'chirilgan darslar tashlab yuboriladi
+    updates = {}
+    enrollment_users = {}
+    for (user_id, lesson_id), value in entries.items():
+        enrollment_id = enrollments.get((user_id, lesson_courses.get(lesson_id)))
+        if enrollment_id is not None:
+            updates[(enrollment_id, lesson_id)] = value
+            enrollment_users[enrollment_id] = user_id
+    if not updates:
+        return 0
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            (progress.enrollment_id, str(progress.lesson_id)): progress
+            for progress in LessonProgress.objects.filter(
+                enrollment_id__in={enrollment_id for enrollment_id, _ in updates},
+                lesson_id__in={lesson_id for _, lesson_id in updates}
+            ).only('id', 'enrollment_id', 'lesson_id', 'last_position')
+        }
+
+        changed = []
+        created = []
+        completions = defaultdict(list)
+        for (enrollment_id, lesson_id), (position, is_completed) in updates.items():
+            progress = existing.get((enrollment_id, lesson_id))
+            if progress is None:
+                created.append(LessonProgress(
+                    enrollment_id=enrollment_id,
+                    lesson_id=lesson_id,
+                    last_position=position or 0
+                ))
+            elif position is not None and position != progress.last_position:
+                progress.last_position = position
+                progress.updated_at = now
+                changed.append(progress)
+            if is_completed:
+                completions[enrollment_id].append(lesson_id)
+
+        LessonProgress.objects.bulk_create(created, ignore_conflicts=True)
+        LessonProgress.objects.bulk_update(changed, ['last_position', 'updated_at'])
+
+        # Faqat haqiqatan o'zgargan yozuvlar hisoblagichga qo'shiladi
+        for enrollment_id, lesson_ids in completions.items():
+            flipped = LessonProgress.objects.filter(
+                enrollment_id=enrollment_id,
+                lesson_id__in=lesson_ids,
+                is_completed=False
+            ).update(is_completed=True, updated_at=now)
+            if flipped:
+                Enrollment.objects.filter(pk=enrollment_id).add_completed(flipped)
+
+    # Keshlangan kurs sahifalarida pozitsiyalar ham ko'rinadi
+    bump_namespace(*{user_namespace('enrollments', user_id) for user_id in enrollment_users.values()})
+
+    return len(updates)
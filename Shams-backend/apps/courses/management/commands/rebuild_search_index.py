@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.courses.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Kurslar va darslar qidiruv indeksini qayta qurish"
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'{count} ta kurs indekslandi'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-18 13:59
+
+from django.db import migrations, models
+
+
+def fill_lesson_counters(apps, schema_editor):
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    Lesson = apps.get_model('courses', 'Lesson')
+    LessonProgress = apps.get_model('courses', 'LessonProgress')
+
+    for enrollment in Enrollment.objects.all().iterator():
+        enrollment.total_lessons = Lesson.objects.filter(course_id=enrollment.course_id).count()
+        enrollment.completed_lessons = LessonProgress.objects.filter(
+            enrollment=enrollment,
+            is_completed=True
+        ).count()
+        enrollment.save(update_fields=['total_lessons', 'completed_lessons'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0, verbose_name='completed lessons'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0, verbose_name='total lessons'),
+        ),
+        migrations.RunPython(fill_lesson_counters, migrations.RunPython.noop),
+    ]
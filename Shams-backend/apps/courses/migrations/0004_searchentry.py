@@ -0,0 +1,112 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE courses_searchentry_fts USING fts5(
+        title, body,
+        content='courses_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_searchentry_ai AFTER INSERT ON courses_searchentry BEGIN
+        INSERT INTO courses_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_searchentry_ad AFTER DELETE ON courses_searchentry BEGIN
+        INSERT INTO courses_searchentry_fts(courses_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_searchentry_au AFTER UPDATE ON courses_searchentry BEGIN
+        INSERT INTO courses_searchentry_fts(courses_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO courses_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS courses_searchentry_au',
+    'DROP TRIGGER IF EXISTS courses_searchentry_ad',
+    'DROP TRIGGER IF EXISTS courses_searchentry_ai',
+    'DROP TABLE IF EXISTS courses_searchentry_fts',
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE courses_searchentry ADD COLUMN document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX courses_searchentry_document_idx ON courses_searchentry USING GIN (document)',
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS courses_searchentry_document_idx',
+    'ALTER TABLE courses_searchentry DROP COLUMN IF EXISTS document',
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def fill_search_entries(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Lesson = apps.get_model('courses', 'Lesson')
+    SearchEntry = apps.get_model('courses', 'SearchEntry')
+
+    entries = [
+        SearchEntry(kind='course', object_id=course.id, course_id=course.id,
+                    title=course.title, body=course.description)
+        for course in Course.objects.filter(is_active=True)
+    ]
+    entries += [
+        SearchEntry(kind='lesson', object_id=lesson.id, course_id=lesson.course_id,
+                    title=lesson.title, body=lesson.description)
+        for lesson in Lesson.objects.filter(is_active=True, course__is_active=True)
+    ]
+    SearchEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_enrollment_enrollment_user_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Kurs'), ('lesson', 'Dars')], max_length=10)),
+                ('object_id', models.UUIDField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='courses.course')),
+            ],
+            options={
+                'verbose_name': 'Qidiruv yozuvi',
+                'verbose_name_plural': 'Qidiruv yozuvlari',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+        migrations.RunPython(fill_search_entries, migrations.RunPython.noop),
+    ]
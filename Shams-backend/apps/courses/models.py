@@ -1,7 +1,10 @@
 import uuid
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from core.cache import bump_namespace, user_namespace
 
 # Create your models here.
 
@@ -45,6 +48,30 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class CourseQuerySet(models.QuerySet):
+    def with_user_stats(self, user):
+        """Darslar soni, yozilish va progressni bitta so'rovda qo'shish"""
+        # Count() bilan JOIN/GROUP BY Meta.ordering'ni o'chirib yuboradi, shuning uchun subquery
+        lessons = Lesson.objects.filter(
+            course=models.OuterRef('pk')
+        ).order_by().values('course').annotate(c=models.Count('id')).values('c')
+        queryset = self.select_related('created_by').annotate(
+            lessons_total=Coalesce(models.Subquery(lessons), models.Value(0))
+        )
+        if user is None or not user.is_authenticated:
+            return queryset.annotate(
+                user_is_enrolled=models.Value(False),
+                user_progress=models.Value(0)
+            )
+        enrollments = Enrollment.objects.filter(course=models.OuterRef('pk'), user=user)
+        return queryset.annotate(
+            user_is_enrolled=models.Exists(enrollments),
+            user_progress=Coalesce(
+                models.Subquery(enrollments.values('progress')[:1]),
+                models.Value(0)
+            )
+        )
+
 class Course(models.Model):
     """Kurs"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -79,6 +106,8 @@ class Course(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('course')
         verbose_name_plural = _('courses')
@@ -108,20 +137,68 @@ class Lesson(models.Model):
     def __str__(self):
         return f'{self.course.title} - {self.title}'
 
+class EnrollmentQuerySet(models.QuerySet):
+    def progress_expression(self, completed):
+        """Foizni bazada hisoblash (darslar bo'lmasa 0, natija 0-100 oralig'ida)"""
+        return models.Case(
+            models.When(total_lessons=0, then=models.Value(0)),
+            default=Least(Greatest(completed * 100 / models.F('total_lessons'), 0), 100),
+            output_field=models.PositiveIntegerField()
+        )
+
+    def add_completed(self, delta):
+        """Tugatilgan darslar hisoblagichini atomar o'zgartirish (0 va darslar soni oralig'ida)"""
+        completed = Greatest(Least(models.F('completed_lessons') + delta, models.F('total_lessons')), 0)
+        return self.update(
+            completed_lessons=completed,
+            progress=self.progress_expression(completed),
+            updated_at=timezone.now()
+        )
+
+    def rebalance(self):
+        """Hisoblagichlarni LessonProgress va darslar soni bo'yicha qayta tiklash"""
+        total = Lesson.objects.filter(
+            course=models.OuterRef('course')
+        ).order_by().values('course').annotate(c=models.Count('id')).values('c')
+        completed = LessonProgress.objects.filter(
+            enrollment=models.OuterRef('pk'),
+            is_completed=True
+        ).order_by().values('enrollment').annotate(c=models.Count('id')).values('c')
+        updated = self.update(
+            total_lessons=Coalesce(models.Subquery(total), models.Value(0)),
+            completed_lessons=Coalesce(models.Subquery(completed), models.Value(0))
+        )
+        self.update(
+            progress=self.progress_expression(models.F('completed_lessons')),
+            updated_at=timezone.now()
+        )
+        # Keshlangan kurs progressi va yozilishlar ro'yxati endi eskirgan
+        user_ids = set(self.values_list('user_id', flat=True))
+        bump_namespace(*(user_namespace('enrollments', user_id) for user_id in user_ids))
+        return updated
+
 class Enrollment(models.Model):
     """Kursga yozilish"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='enrollments')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     progress = models.PositiveIntegerField(_('progress'), default=0)  # 0-100%
+    completed_lessons = models.PositiveIntegerField(_('completed lessons'), default=0)
+    total_lessons = models.PositiveIntegerField(_('total lessons'), default=0)
     enrolled_at = models.DateTimeField(auto_now_add=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EnrollmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('enrollment')
         verbose_name_plural = _('enrollments')
         unique_together = ['user', 'course']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='enrollment_user_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='enrollment_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.email} - {self.course.title}'
@@ -143,3 +220,30 @@ class LessonProgress(models.Model):
 
     def __str__(self):
         return f'{self.enrollment.user.email} - {self.lesson.title}'
+
+class SearchEntry(models.Model):
+    """
+    Qidiruv indeksi yozuvi (kurs yoki dars).
+
+    Teskari indeks bazaning o'zida: SQLite'da FTS5 jadvali, PostgreSQL'da
+    GIN indeksli tsvector ustuni (0004_searchentry migratsiyasi).
+    """
+    KIND_CHOICES = (
+        ('course', 'Kurs'),
+        ('lesson', 'Dars'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='search_entries')
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Qidiruv yozuvi'
+        verbose_name_plural = 'Qidiruv yozuvlari'
+        unique_together = ['kind', 'object_id']
+
+    def __str__(self):
+        return f'{self.kind} - {self.title}'
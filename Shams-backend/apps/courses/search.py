@@ -0,0 +1,175 @@
+"""
+Kurslar va darslar bo'yicha to'liq matnli qidiruv.
+
+SearchEntry jadvali model signallari orqali yangilanadi, teskari indeksni
+esa bazaning o'zi yuritadi: SQLite'da FTS5 (triggerlar bilan), PostgreSQL'da
+GIN indeksli tsvector ustuni. Boshqa bazalarda icontains'ga qaytiladi.
+"""
+import re
+import uuid
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from .models import Course, Lesson, SearchEntry
+
+# Baza matnga faqat shu belgilarni qo'yadi; HTML'ga escape'dan keyin aylantiriladi
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_END = '\ue001'
+
+SQLITE_QUERY = """
+    SELECT e.kind, e.object_id, e.course_id,
+           highlight(courses_searchentry_fts, 0, %s, %s),
+           snippet(courses_searchentry_fts, 1, %s, %s, '…', 16),
+           bm25(courses_searchentry_fts, 10.0, 1.0) AS rank
+    FROM courses_searchentry_fts
+    JOIN courses_searchentry e ON e.id = courses_searchentry_fts.rowid
+    WHERE courses_searchentry_fts MATCH %s
+    ORDER BY rank
+    LIMIT %s
+"""
+
+# ts_headline qimmat, shuning uchun faqat LIMIT'dan o'tgan qatorlar uchun hisoblanadi
+POSTGRES_QUERY = """
+    SELECT r.kind, r.object_id, r.course_id,
+           ts_headline('simple', r.title, r.query, %s),
+           ts_headline('simple', r.body, r.query, %s),
+           r.rank
+    FROM (
+        SELECT e.kind, e.object_id, e.course_id, e.title, e.body, q AS query,
+               ts_rank(e.document, q) AS rank
+        FROM courses_searchentry e, websearch_to_tsquery('simple', %s) q
+        WHERE e.document @@ q
+        ORDER BY rank DESC
+        LIMIT %s
+    ) r
+    ORDER BY r.rank DESC
+"""
+
+
+def render_highlight(text):
+    """Matnni escape qilib, belgilarni <mark> teglariga aylantirish"""
+    if text is None:
+        return None
+    return escape(text).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+
+def _sqlite_match(query):
+    # Foydalanuvchi matnini FTS5 sintaksisiga aylantirish: har bir so'z prefiks sifatida
+    tokens = re.findall(r'\w+', query)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _entry_values(obj, course_id):
+    return {
+        'course_id': course_id,
+        'title': obj.title,
+        'body': obj.description,
+    }
+
+
+def index_course(course):
+    """Kurs va uning darslarini indeksga yozish (faol bo'lmasa olib tashlash)"""
+    if not course.is_active:
+        SearchEntry.objects.filter(course_id=course.pk).delete()
+        return
+
+    SearchEntry.objects.update_or_create(
+        kind='course',
+        object_id=course.pk,
+        defaults=_entry_values(course, course.pk)
+    )
+    # Darslar yozuvlari bitta DELETE va bitta bulk_create bilan yangilanadi
+    SearchEntry.objects.filter(kind='lesson', course_id=course.pk).delete()
+    SearchEntry.objects.bulk_create([
+        SearchEntry(kind='lesson', object_id=lesson.pk, **_entry_values(lesson, course.pk))
+        for lesson in Lesson.objects.filter(course_id=course.pk, is_active=True)
+    ])
+
+
+def index_lesson(lesson, course_is_active=None):
+    """Darsni indeksga yozish (dars yoki kurs faol bo'lmasa olib tashlash)"""
+    if course_is_active is None:
+        course_is_active = lesson.course.is_active
+    if not (lesson.is_active and course_is_active):
+        remove_entry('lesson', lesson.pk)
+        return
+
+    SearchEntry.objects.update_or_create(
+        kind='lesson',
+        object_id=lesson.pk,
+        defaults=_entry_values(lesson, lesson.course_id)
+    )
+
+
+def remove_entry(kind, object_id):
+    SearchEntry.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def search(query, limit=20):
+    """
+    Reyting bo'yicha saralangan natijalar.
+
+    Har bir natija: type, id, course_id, title va snippet (escape qilingan
+    HTML, mos so'zlar <mark> bilan belgilangan), rank (katta - yaxshiroq).
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    if connection.vendor == 'sqlite':
+        match = _sqlite_match(query)
+        if not match:
+            return []
+        sql = SQLITE_QUERY
+        params = [HIGHLIGHT_START, HIGHLIGHT_END, HIGHLIGHT_START, HIGHLIGHT_END, match, limit]
+    elif connection.vendor == 'postgresql':
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}'
+        sql = POSTGRES_QUERY
+        params = [options + ', HighlightAll=true', options + ', MaxWords=35, MinWords=15', query, limit]
+    else:
+        return _fallback_search(query, limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'type': kind,
+            # SQLite UUID'ni tiresiz hex ko'rinishida saqlaydi
+            'id': str(uuid.UUID(str(object_id))),
+            'course_id': str(uuid.UUID(str(course_id))),
+            'title': render_highlight(title),
+            'snippet': render_highlight(snippet),
+            # bm25 manfiy qiymat qaytaradi (kichigi yaxshiroq)
+            'rank': -rank if connection.vendor == 'sqlite' else rank,
+        }
+        for kind, object_id, course_id, title, snippet, rank in rows
+    ]
+
+
+def _fallback_search(query, limit):
+    entries = SearchEntry.objects.filter(
+        Q(title__icontains=query) | Q(body__icontains=query)
+    )[:limit]
+    return [
+        {
+            'type': entry.kind,
+            'id': str(entry.object_id),
+            'course_id': str(entry.course_id),
+            'title': render_highlight(entry.title),
+            'snippet': render_highlight(entry.body[:200]),
+            'rank': 0,
+        }
+        for entry in entries
+    ]
+
+
+def rebuild_index():
+    """Indeksni noldan qurish"""
+    SearchEntry.objects.all().delete()
+    count = 0
+    for course in Course.objects.filter(is_active=True).iterator():
+        index_course(course)
+        count += 1
+    return count
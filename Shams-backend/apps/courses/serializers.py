@@ -1,5 +1,8 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Category, Course, Lesson, Enrollment, LessonProgress
+from .syllabus import get_syllabus
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,9 +17,6 @@ class CategorySerializer(serializers.ModelSerializer):
         ]
 
 class LessonSerializer(serializers.ModelSerializer):
-    is_completed = serializers.SerializerMethodField()
-    last_position = serializers.SerializerMethodField()
-    
     class Meta:
         model = Lesson
         fields = [
@@ -26,29 +26,10 @@ class LessonSerializer(serializers.ModelSerializer):
             'description',
             'order'
         ]
-    
-    def get_is_completed(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                progress = obj.progress.get(user=request.user)
-                return progress.is_completed
-            except LessonProgress.DoesNotExist:
-                return False
-        return False
-    
-    def get_last_position(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                progress = obj.progress.get(user=request.user)
-                return progress.last_position
-            except LessonProgress.DoesNotExist:
-                return 0
-        return 0
 
 class CourseSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True)
+    # Course.category - choices'li CharField, Category modeliga bog'lanmagan
+    category = serializers.CharField(read_only=True)
     created_by = serializers.SerializerMethodField()
     lessons_count = serializers.SerializerMethodField()
     is_enrolled = serializers.SerializerMethodField()
@@ -76,17 +57,24 @@ class CourseSerializer(serializers.ModelSerializer):
         }
     
     def get_lessons_count(self, obj):
+        # Course.objects.with_user_stats() annotatsiyasi bo'lsa, so'rov yubormaymiz
+        if hasattr(obj, 'lessons_total'):
+            return obj.lessons_total
         return obj.lessons.count()
     
     def get_is_enrolled(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'user_is_enrolled'):
+                return obj.user_is_enrolled
             return obj.enrollments.filter(user=request.user).exists()
         return False
     
     def get_progress(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'user_progress'):
+                return obj.user_progress
             try:
                 enrollment = obj.enrollments.get(user=request.user)
                 return enrollment.progress
@@ -95,10 +83,34 @@ class CourseSerializer(serializers.ModelSerializer):
         return 0
 
 class CourseDetailSerializer(CourseSerializer):
-    lessons = LessonSerializer(many=True, read_only=True)
+    lessons = serializers.SerializerMethodField()
     
     class Meta(CourseSerializer.Meta):
         fields = CourseSerializer.Meta.fields + ['lessons']
+    
+    def get_lessons(self, obj):
+        # Darslar ro'yxati keshdan, foydalanuvchi progressi esa bitta so'rov bilan
+        lessons = get_syllabus(obj.pk)
+        progress = {}
+        request = self.context.get('request')
+        if request and request.user.is_authenticated and getattr(obj, 'user_is_enrolled', True):
+            progress = {
+                str(lesson_id): (is_completed, last_position)
+                for lesson_id, is_completed, last_position in LessonProgress.objects.filter(
+                    enrollment__course_id=obj.pk,
+                    enrollment__user=request.user
+                ).values_list('lesson_id', 'is_completed', 'last_position')
+            }
+        
+        result = []
+        for lesson in lessons:
+            is_completed, last_position = progress.get(lesson['id'], (False, 0))
+            result.append({
+                **lesson,
+                'is_completed': is_completed,
+                'last_position': last_position
+            })
+        return result
 
 class EnrollmentSerializer(serializers.ModelSerializer):
     course = CourseSerializer(read_only=True)
@@ -124,6 +136,113 @@ class LessonProgressSerializer(serializers.ModelSerializer):
             'last_position'
         ]
 
+class LessonBulkItemSerializer(serializers.Serializer):
+    id = serializers.UUIDField(required=False)
+    title = serializers.CharField(max_length=255)
+    video_url = serializers.URLField()
+    description = serializers.CharField(allow_blank=True, required=False, default='')
+    is_active = serializers.BooleanField(default=True)
+
+class LessonBulkSerializer(serializers.Serializer):
+    """
+    Kurs darslarini bitta so'rovda yaratish, yangilash va tartiblash.
+    
+    Ro'yxatdagi o'rin darsning tartib raqami bo'ladi. Ro'yxatda yo'q darslar
+    prune=true bo'lsa o'chiriladi, aks holda oxiriga o'z tartibida qo'shiladi.
+    """
+    lessons = LessonBulkItemSerializer(many=True)
+    prune = serializers.BooleanField(default=False)
+    
+    def validate_lessons(self, value):
+        if len(value) > 1000:
+            raise serializers.ValidationError("Bir so'rovda 1000 tadan ko'p dars yuborib bo'lmaydi")
+        ids = [item['id'] for item in value if item.get('id')]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Dars ro'yxatida takroriy id bor")
+        return value
+    
+    def create(self, validated_data):
+        course = validated_data['course']
+        items = validated_data['lessons']
+        now = timezone.now()
+        
+        with transaction.atomic():
+            existing = {
+                lesson.id: lesson
+                for lesson in Lesson.objects.select_for_update().filter(course=course)
+            }
+            unknown = [str(item['id']) for item in items if item.get('id') and item['id'] not in existing]
+            if unknown:
+                raise serializers.ValidationError({'lessons': [f"Bu kursda bunday dars yo'q: {', '.join(unknown)}"]})
+            
+            ordered = []
+            to_create = []
+            for item in items:
+                lesson = existing.pop(item['id']) if item.get('id') else Lesson(course=course)
+                lesson.title = item['title']
+                lesson.video_url = item['video_url']
+                lesson.description = item.get('description', '')
+                lesson.is_active = item['is_active']
+                lesson.updated_at = now
+                if lesson._state.adding:
+                    to_create.append(lesson)
+                ordered.append(lesson)
+            
+            rest = sorted(existing.values(), key=lambda lesson: lesson.order)
+            if validated_data['prune']:
+                Lesson.objects.filter(pk__in=[lesson.pk for lesson in rest]).delete()
+            else:
+                ordered.extend(rest)
+            to_update = [lesson for lesson in ordered if not lesson._state.adding]
+            
+            # Deferred renumbering: unique(course, order) buzilmasligi uchun avval
+            # mavjud darslar band bo'lmagan oraliqqa ko'chiriladi, keyin joyiga qo'yiladi
+            offset = max([lesson.order for lesson in to_update] + [len(ordered)]) + 1
+            for position, lesson in enumerate(to_update, start=1):
+                lesson.order = offset + position
+            Lesson.objects.bulk_update(to_update, ['order'])
+            
+            for position, lesson in enumerate(ordered, start=1):
+                lesson.order = position
+            Lesson.objects.bulk_update(
+                to_update,
+                ['title', 'video_url', 'description', 'is_active', 'order', 'updated_at']
+            )
+            Lesson.objects.bulk_create(to_create)
+        
+        return ordered
+
+class LessonProgressUpdateSerializer(serializers.Serializer):
+    is_completed = serializers.BooleanField(required=False)
+    last_position = serializers.IntegerField(min_value=0, max_value=2147483647, required=False)
+
+class LessonHeartbeatSerializer(serializers.Serializer):
+    lesson_id = serializers.UUIDField()
+    position = serializers.IntegerField(min_value=0)
+    completed = serializers.BooleanField(default=False)
+    
+    def to_internal_value(self, data):
+        # [lesson_id, position, completed] ko'rinishidagi ixcham formatni ham qabul qilamiz
+        if isinstance(data, (list, tuple)):
+            data = dict(zip(['lesson_id', 'position', 'completed'], data))
+        return super().to_internal_value(data)
+
+class LessonHeartbeatBatchSerializer(serializers.Serializer):
+    heartbeats = LessonHeartbeatSerializer(many=True, allow_empty=False)
+    
+    def validate_heartbeats(self, value):
+        if len(value) > 200:
+            raise serializers.ValidationError("Bir so'rovda 200 tadan ko'p heartbeat yuborib bo'lmaydi")
+        return value
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.UUIDField()
+    course_id = serializers.UUIDField()
+    title = serializers.CharField()
+    snippet = serializers.CharField(allow_null=True)
+    rank = serializers.FloatField()
+
 class CourseCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import Course, Lesson, Enrollment, LessonProgress
+from core.cache import bump_namespace, user_namespace
+from .models import Category, Course, Lesson, Enrollment, LessonProgress
+from .tasks import rebalance_enrollment_counters
+from . import search
+from .syllabus import syllabus_namespace
 
 User = get_user_model()
 
@@ -9,11 +14,62 @@ User = get_user_model()
 def create_lesson_progress(sender, instance, created, **kwargs):
     """Create lesson progress records when a user enrolls in a course"""
     if created:
-        course = instance.course
-        lessons = Lesson.objects.filter(course=course)
-        for lesson in lessons:
-            LessonProgress.objects.create(
-                user=instance.user,
-                lesson=lesson,
-                enrollment=instance
-            ) 
\ No newline at end of file
+        lesson_ids = list(
+            Lesson.objects.filter(course_id=instance.course_id).values_list('id', flat=True)
+        )
+        # Lessons added later get their progress row lazily in update_progress
+        LessonProgress.objects.bulk_create(
+            [LessonProgress(enrollment=instance, lesson_id=lesson_id) for lesson_id in lesson_ids],
+            ignore_conflicts=True
+        )
+        if instance.total_lessons != len(lesson_ids):
+            instance.total_lessons = len(lesson_ids)
+            Enrollment.objects.filter(pk=instance.pk).update(total_lessons=len(lesson_ids))
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_enrollment_cache(sender, instance, **kwargs):
+    """Drop the user's cached course responses (is_enrolled / progress)"""
+    bump_namespace(user_namespace('enrollments', instance.user_id))
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    bump_namespace('categories')
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_cache(sender, instance, **kwargs):
+    bump_namespace('courses')
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_lesson_cache(sender, instance, **kwargs):
+    bump_namespace('lessons', syllabus_namespace(instance.course_id))
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    """Rebalance enrollment counters when a lesson is added to a course"""
+    if created:
+        course_id = instance.course_id
+        transaction.on_commit(lambda: rebalance_enrollment_counters.delay(str(course_id)))
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, **kwargs):
+    """Rebalance enrollment counters when a lesson is removed from a course"""
+    course_id = instance.course_id
+    transaction.on_commit(lambda: rebalance_enrollment_counters.delay(str(course_id)))
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, **kwargs):
+    """Keep the full-text search index in sync with the course"""
+    search.index_course(instance)
+
+@receiver(post_save, sender=Lesson)
+def index_lesson(sender, instance, **kwargs):
+    """Keep the full-text search index in sync with the lesson"""
+    search.index_lesson(instance)
+
+@receiver(post_delete, sender=Lesson)
+def unindex_lesson(sender, instance, **kwargs):
+    search.remove_entry('lesson', instance.pk)
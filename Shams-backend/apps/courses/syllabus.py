@@ -0,0 +1,31 @@
+"""
+Kurs darslari ro'yxatining (syllabus) keshdagi nusxasi.
+
+Ro'yxat statik - hamma foydalanuvchilar uchun bir xil, shuning uchun u bir
+marta serializatsiya qilinadi va 'syllabus:<course_id>' nom maydoni bilan
+keshlanadi. Dars o'zgarganda signal shu nom maydonini yangilaydi.
+"""
+from django.core.cache import cache
+from core.cache import versioned_key
+from .models import Lesson
+
+SYLLABUS_TIMEOUT = 60 * 60
+
+
+def syllabus_namespace(course_id):
+    return f'syllabus:{course_id}'
+
+
+def get_syllabus(course_id):
+    """Kurs darslari ro'yxati (LessonSerializer bilan bir xil maydonlar)"""
+    key = versioned_key([syllabus_namespace(course_id)], 'lessons')
+    lessons = cache.get(key)
+    if lessons is None:
+        lessons = [
+            {**lesson, 'id': str(lesson['id'])}
+            for lesson in Lesson.objects.filter(course_id=course_id).values(
+                'id', 'title', 'video_url', 'description', 'order'
+            )
+        ]
+        cache.set(key, lessons, SYLLABUS_TIMEOUT)
+    return lessons
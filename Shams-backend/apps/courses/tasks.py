@@ -0,0 +1,13 @@
+from celery import shared_task
+from .models import Enrollment
+from .heartbeats import flush_heartbeats
+
+@shared_task
+def rebalance_enrollment_counters(course_id):
+    """Kursdagi barcha yozilishlar hisoblagichlarini qayta tiklash"""
+    return Enrollment.objects.filter(course_id=course_id).rebalance()
+
+@shared_task
+def flush_lesson_heartbeats():
+    """Buferdagi video pozitsiyalarini bazaga yozish"""
+    return flush_heartbeats()
@@ -1,3 +1,135 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import DatabaseError
 from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from core.kv import get_store
+from .heartbeats import COMPLETED_KEY, POSITIONS_KEY, buffer_heartbeats, flush_heartbeats
+from .models import Course, Lesson, Enrollment, LessonProgress
 
-# Create your tests here.
+
+class CourseTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('student@example.com', 'secret', username='student', full_name='Student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_course(self, index, lessons=2):
+        course = Course.objects.create(
+            title=f'Kurs {index}',
+            slug=f'kurs-{index}',
+            description='Tavsif',
+            category='ai',
+            level='beginner',
+            thumbnail='courses/thumbnails/x.jpg',
+            created_by=self.user
+        )
+        for order in range(lessons):
+            Lesson.objects.create(course=course, title=f'Dars {order}', video_url='https://example.com/v', order=order)
+        return course
+
+
+class CourseListTests(CourseTestMixin, TestCase):
+    def test_list_query_count_does_not_grow_with_courses(self):
+        for index in range(3):
+            self.create_course(index)
+        Enrollment.objects.create(user=self.user, course=Course.objects.first())
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/courses/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+
+        for index in range(3, 10):
+            self.create_course(index)
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/courses/courses/')
+        self.assertEqual(response.data['count'], 10)
+
+        course = response.data['results'][0]
+        self.assertEqual(course['category'], 'ai')
+        self.assertEqual(course['lessons_count'], 2)
+
+    def test_detail_returns_lessons(self):
+        course = self.create_course(0, lessons=3)
+        response = self.client.get(f'/api/courses/courses/{course.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['lessons']), 3)
+
+
+class LessonProgressTests(CourseTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = self.create_course(0, lessons=4)
+        self.lessons = list(self.course.lessons.all())
+        self.enrollment = Enrollment.objects.create(user=self.user, course=self.course)
+
+    def update(self, lesson, data):
+        return self.client.post(f'/api/courses/lessons/{lesson.pk}/update_progress/', data, format='json')
+
+    def test_completion_updates_counters_once(self):
+        response = self.update(self.lessons[0], {'is_completed': True, 'last_position': 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_completed'])
+        self.assertEqual(response.data['last_position'], 30)
+
+        self.update(self.lessons[0], {'is_completed': True})
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(self.enrollment.progress, 25)
+
+        self.update(self.lessons[0], {'is_completed': False})
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 0)
+        self.assertEqual(self.enrollment.progress, 0)
+
+    def test_invalid_input_returns_400(self):
+        for data in ({'is_completed': 'maybe'}, {'last_position': -5}, {'last_position': 'abc'}):
+            response = self.update(self.lessons[0], data)
+            self.assertEqual(response.status_code, 400, data)
+        self.assertFalse(self.enrollment.lesson_progress.filter(is_completed=True).exists())
+
+
+class HeartbeatFlushTests(CourseTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        get_store().delete(POSITIONS_KEY)
+        get_store().delete(COMPLETED_KEY)
+        self.course = self.create_course(0, lessons=2)
+        self.lessons = list(self.course.lessons.all())
+        self.enrollment = Enrollment.objects.create(user=self.user, course=self.course)
+
+    def test_flush_writes_positions_and_completions(self):
+        buffer_heartbeats(self.user.pk, [
+            {'lesson_id': self.lessons[0].pk, 'position': 40},
+            {'lesson_id': self.lessons[1].pk, 'position': 90, 'completed': True},
+        ])
+        self.assertEqual(flush_heartbeats(), 2)
+
+        progress = LessonProgress.objects.get(enrollment=self.enrollment, lesson=self.lessons[0])
+        self.assertEqual(progress.last_position, 40)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(get_store().hgetall(POSITIONS_KEY), {})
+
+    def test_failed_flush_requeues_buffer_without_overwriting_newer_positions(self):
+        buffer_heartbeats(self.user.pk, [{'lesson_id': self.lessons[0].pk, 'position': 40, 'completed': True}])
+
+        def fail_after_newer_heartbeat(*args, **kwargs):
+            buffer_heartbeats(self.user.pk, [{'lesson_id': self.lessons[0].pk, 'position': 55}])
+            raise DatabaseError('connection lost')
+
+        with mock.patch.object(LessonProgress.objects, 'bulk_update', side_effect=fail_after_newer_heartbeat):
+            with self.assertRaises(DatabaseError):
+                flush_heartbeats()
+        field = f'{self.user.pk}:{self.lessons[0].pk}'
+        self.assertEqual(get_store().hgetall(POSITIONS_KEY), {field: '55'})
+        self.assertIn(field, get_store().hgetall(COMPLETED_KEY))
+
+        flush_heartbeats()
+        progress = LessonProgress.objects.get(enrollment=self.enrollment, lesson=self.lessons[0])
+        self.assertEqual(progress.last_position, 55)
+        self.assertTrue(progress.is_completed)
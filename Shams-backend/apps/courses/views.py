@@ -5,7 +5,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
+from django.utils import timezone
+from django.db import transaction
 from django.contrib.auth import get_user_model
+from core.cache import CatalogCacheMixin, ConditionalGetMixin, bump_namespace, user_namespace
+from core.pagination import CreatedAtCursorPagination
 from .models import Category, Course, Lesson, Enrollment, LessonProgress
 from .serializers import (
     CategorySerializer,
@@ -15,21 +19,32 @@ from .serializers import (
     LessonSerializer,
     LessonCreateSerializer,
     EnrollmentSerializer,
-    LessonProgressSerializer
+    LessonProgressSerializer,
+    LessonProgressUpdateSerializer,
+    LessonHeartbeatBatchSerializer,
+    LessonBulkSerializer,
+    SearchResultSerializer
 )
+from .heartbeats import buffer_heartbeats
+from .tasks import rebalance_enrollment_counters
+from .syllabus import syllabus_namespace
+from . import search as catalog_search
 
 User = get_user_model()
 
 # Create your views here.
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     """Kategoriyalar"""
+    cache_namespaces = ('categories',)
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalGetMixin, CatalogCacheMixin, viewsets.ModelViewSet):
+    cache_namespaces = ('courses', 'lessons')
+    cache_user_namespace = 'enrollments'
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -43,6 +58,8 @@ class CourseViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve']:
+            queryset = queryset.with_user_stats(self.request.user)
         if not self.request.user.is_staff:
             return queryset.filter(is_active=True)
         return queryset
@@ -65,6 +82,39 @@ class CourseViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED
         )
     
+    @action(detail=True, methods=['put'], url_path='lessons/bulk', permission_classes=[permissions.IsAdminUser])
+    def bulk_lessons(self, request, pk=None):
+        """Darslarni ommaviy import qilish va qayta tartiblash"""
+        course = self.get_object()
+        serializer = LessonBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lessons = serializer.save(course=course)
+        
+        # bulk_* signallarni chaqirmaydi: kesh, qidiruv va hisoblagichlarni o'zimiz yangilaymiz
+        bump_namespace('lessons', syllabus_namespace(course.pk))
+        catalog_search.index_course(course)
+        transaction.on_commit(lambda: rebalance_enrollment_counters.delay(str(course.pk)))
+        
+        return Response(
+            LessonSerializer(lessons, many=True).data,
+            status=status.HTTP_200_OK
+        )
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Kurslar va darslar bo'yicha qidiruv"""
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 50)
+        except ValueError:
+            limit = 20
+        
+        results = catalog_search.search(query, limit=max(limit, 1))
+        return Response(
+            SearchResultSerializer(results, many=True).data,
+            status=status.HTTP_200_OK
+        )
+    
     @action(detail=True, methods=['get'])
     def progress(self, request, pk=None):
         course = self.get_object()
@@ -78,7 +128,8 @@ class CourseViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
+    cache_namespaces = ('lessons', 'courses')
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -97,6 +148,8 @@ class LessonViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def update_progress(self, request, pk=None):
         lesson = self.get_object()
+        serializer = LessonProgressUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         enrollment = get_object_or_404(
             Enrollment,
             user=request.user,
@@ -108,24 +161,52 @@ class LessonViewSet(viewsets.ModelViewSet):
             lesson=lesson
         )
         
-        progress.is_completed = request.data.get('is_completed', progress.is_completed)
-        progress.last_position = request.data.get('last_position', progress.last_position)
-        progress.save()
+        was_completed = progress.is_completed
+        previous_position = progress.last_position
+        progress.is_completed = serializer.validated_data.get('is_completed', progress.is_completed)
+        progress.last_position = serializer.validated_data.get('last_position', progress.last_position)
         
-        # Update course progress
-        total_lessons = lesson.course.lessons.count()
-        completed_lessons = LessonProgress.objects.filter(
-            enrollment=enrollment,
-            is_completed=True
-        ).count()
+        # Holat o'zgargan bo'lsa, faqat bitta so'rov uni yangilashi kerak
+        updated = LessonProgress.objects.filter(
+            pk=progress.pk,
+            is_completed=was_completed
+        ).update(
+            is_completed=progress.is_completed,
+            last_position=progress.last_position,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            # Parallel so'rov holatni o'zgartirib ulgurdi: bazadagi holatni qaytaramiz
+            progress.refresh_from_db()
+            return Response(
+                LessonProgressSerializer(progress).data,
+                status=status.HTTP_200_OK
+            )
         
-        enrollment.progress = int((completed_lessons / total_lessons) * 100)
-        enrollment.save()
+        # Update course progress
+        if progress.is_completed != was_completed:
+            delta = 1 if progress.is_completed else -1
+            Enrollment.objects.filter(pk=enrollment.pk).add_completed(delta)
+        if progress.is_completed != was_completed or progress.last_position != previous_position:
+            # Kurs sahifasi progress va last_position'ni ko'rsatadi
+            bump_namespace(user_namespace('enrollments', request.user.pk))
         
         return Response(
             LessonProgressSerializer(progress).data,
             status=status.HTTP_200_OK
         )
+    
+    @action(detail=False, methods=['post'])
+    def heartbeat(self, request):
+        """Video pozitsiyalarini buferga yozish (bazaga davriy task yozadi)"""
+        serializer = LessonHeartbeatBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        accepted = buffer_heartbeats(request.user.id, serializer.validated_data['heartbeats'])
+        return Response(
+            {'accepted': accepted},
+            status=status.HTTP_202_ACCEPTED
+        )
 
 class CourseListView(generics.ListCreateAPIView):
     queryset = Course.objects.all()
@@ -133,7 +214,7 @@ class CourseListView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Course.objects.all()
+        queryset = Course.objects.with_user_stats(self.request.user)
         category = self.request.query_params.get('category', None)
         if category:
             queryset = queryset.filter(category=category)
@@ -195,6 +276,7 @@ class EnrollmentListView(generics.ListCreateAPIView):
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache import bump_namespace
+from .models import PlatformStatistic, Feature
+
+@receiver(post_save, sender=PlatformStatistic)
+@receiver(post_delete, sender=PlatformStatistic)
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+def invalidate_landing_cache(sender, instance, **kwargs):
+    bump_namespace('landing')
@@ -3,6 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.core.cache import cache
+from core.cache import get_validators, not_modified, set_validators, versioned_key
 from .models import PlatformStatistic, Feature
 from .serializers import PlatformStatisticSerializer, FeatureSerializer
 
@@ -13,12 +14,18 @@ class LandingSummaryView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
+        # Ma'lumot o'zgarmagan bo'lsa 304
+        etag, last_modified = get_validators(['landing'], 'summary')
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        
         # Cache'dan ma'lumotlarni olish
-        cache_key = 'landing_summary'
+        cache_key = versioned_key(['landing'], 'summary')
         cached_data = cache.get(cache_key)
         
         if cached_data:
-            return Response(cached_data)
+            return set_validators(Response(cached_data), etag, last_modified)
         
         # Statistikani olish
         try:
@@ -40,4 +47,4 @@ class LandingSummaryView(APIView):
         # Cache'ga saqlash (1 soat)
         cache.set(cache_key, response_data, 3600)
         
-        return Response(response_data)
+        return set_validators(Response(response_data), etag, last_modified)
@@ -4,14 +4,16 @@ from .models import Book, BookPurchase, BookDownload
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'category', 'status', 'price', 'is_active', 'created_at')
-    list_filter = ('category', 'status', 'is_active', 'created_at')
+    list_filter = ('category', 'status', 'is_active', 'preview_status', 'created_at')
     search_fields = ('title', 'author', 'description')
     ordering = ('-created_at',)
+    readonly_fields = ('preview_status', 'page_count', 'file_size', 'thumbnails')
     fieldsets = (
         (None, {'fields': ('title', 'author', 'description')}),
         ('Kategoriya va Status', {'fields': ('category', 'status')}),
         ('Narx', {'fields': ('price', 'discount')}),
         ('Media', {'fields': ('file', 'preview_file')}),
+        ('Preview', {'fields': ('preview_status', 'page_count', 'file_size', 'thumbnails')}),
         ('Status', {'fields': ('is_active',)}),
         ('Yaratuvchi', {'fields': ('uploaded_by',)}),
     )
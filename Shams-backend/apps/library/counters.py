@@ -0,0 +1,43 @@
+"""
+Kitob yuklab olishlar hisoblagichi (write-behind).
+
+Har bir yuklash Book qatorini yangilamaydi: hisoblagich tezkor omborda
+atomar oshiriladi va flush_download_counts() uni davriy ravishda
+Book.download_count'ga F() bilan qo'shadi. Serializer'lar bazadagi qiymatga
+hali yozilmagan hisobni qo'shib ko'rsatadi.
+"""
+from django.db import transaction
+from django.db.models import F
+from core.cache import bump_namespace
+from core.kv import get_store
+from .models import Book
+
+PENDING_DOWNLOADS_KEY = 'library:downloads:pending'
+
+
+def record_download(book_id):
+    return get_store().hincrby(PENDING_DOWNLOADS_KEY, str(book_id))
+
+
+def pending_downloads():
+    """{book_id: hali yozilmagan yuklashlar soni}"""
+    return {book_id: int(count) for book_id, count in get_store().hgetall(PENDING_DOWNLOADS_KEY).items()}
+
+
+def flush_download_counts():
+    """Buferdagi hisoblarni bazaga yozish"""
+    store = get_store()
+    pending = store.hpopall(PENDING_DOWNLOADS_KEY)
+    try:
+        with transaction.atomic():
+            for book_id, count in pending.items():
+                Book.objects.filter(pk=book_id).update(download_count=F('download_count') + int(count))
+    except Exception:
+        # Tranzaksiya bekor bo'ldi: hisoblar buferga qaytariladi (oraliqdagi yuklashlarga qo'shiladi)
+        for book_id, count in pending.items():
+            store.hincrby(PENDING_DOWNLOADS_KEY, book_id, int(count))
+        raise
+    if pending:
+        # Ro'yxatlarning ETag'i ham yangilanadi (update() signal yubormaydi)
+        bump_namespace('library')
+    return len(pending)
@@ -0,0 +1,64 @@
+"""
+Kitoblarga kirish huquqi.
+
+Foydalanuvchining sotib olgan va yuklagan kitoblari id to'plamlari bir marta
+yig'iladi va keshda saqlanadi; BookPurchase/BookDownload o'zgarganda signal
+keshni o'chiradi. Serializer'lar har bir kitob uchun so'rov yubormasdan
+to'plamga tegishlilikni tekshiradi.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from .models import BookPurchase, BookDownload
+
+ENTITLEMENTS_TIMEOUT = 60 * 60
+EMPTY_ENTITLEMENTS = {'purchased': frozenset(), 'downloaded': frozenset()}
+
+
+def entitlements_cache_key(user_id):
+    return f'library:entitlements:{user_id}'
+
+
+def get_entitlements(user):
+    """{'purchased': {book_id, ...}, 'downloaded': {book_id, ...}}"""
+    if not user.is_authenticated:
+        return EMPTY_ENTITLEMENTS
+    key = entitlements_cache_key(user.pk)
+    entitlements = cache.get(key)
+    if entitlements is None:
+        entitlements = {
+            'purchased': frozenset(
+                str(book_id) for book_id in BookPurchase.objects.filter(user=user).values_list('book_id', flat=True)
+            ),
+            'downloaded': frozenset(
+                str(book_id) for book_id in BookDownload.objects.filter(user=user).values_list('book_id', flat=True)
+            ),
+        }
+        cache.set(key, entitlements, ENTITLEMENTS_TIMEOUT)
+    return entitlements
+
+
+def get_request_entitlements(request):
+    """So'rov davomida bir marta olinadi"""
+    if not hasattr(request, '_library_entitlements'):
+        request._library_entitlements = get_entitlements(request.user)
+    return request._library_entitlements
+
+
+def invalidate_entitlements(user_id):
+    # Tranzaksiya tugagach o'chiramiz, aks holda parallel so'rov eski to'plamni qayta yozib qo'yishi mumkin
+    transaction.on_commit(lambda: cache.delete(entitlements_cache_key(user_id)))
+
+
+def is_purchased(entitlements, book):
+    return str(book.pk) in entitlements['purchased']
+
+
+def has_access(user, book, entitlements=None):
+    """Bepul kitob, admin yoki sotib olingan kitob"""
+    if book.status == 'free':
+        return True
+    if not user.is_authenticated:
+        return False
+    if entitlements is None:
+        entitlements = get_entitlements(user)
+    return user.is_staff or is_purchased(entitlements, book)
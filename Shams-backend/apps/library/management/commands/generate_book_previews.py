@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.library.models import Book
+from apps.library.tasks import generate_book_preview
+
+
+class Command(BaseCommand):
+    help = "Preview'i yo'q kitoblar uchun preview va thumbnail yaratishni navbatga qo'yish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help="Xatolik bilan tugaganlarni ham qayta ishlash")
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['failed'] else ['pending']
+        book_ids = Book.objects.filter(preview_status__in=statuses).values_list('pk', flat=True)
+        count = 0
+        for book_id in book_ids.iterator():
+            generate_book_preview.delay(str(book_id))
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'{count} ta kitob navbatga qo\'yildi'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_update_book_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size in bytes', null=True, verbose_name='file size'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='page count'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('skipped', 'Skipped'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='preview status'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict, help_text='{"small": "books/thumbnails/..."}', verbose_name='thumbnails'),
+        ),
+    ]
@@ -21,6 +21,20 @@ class Book(models.Model):
     )
     file = models.FileField(_('file'), upload_to='books/')
     preview_file = models.FileField(_('preview file'), upload_to='books/previews/', null=True, blank=True)
+    preview_status = models.CharField(
+        _('preview status'),
+        max_length=20,
+        choices=[
+            ('pending', 'Pending'),
+            ('ready', 'Ready'),
+            ('skipped', 'Skipped'),
+            ('failed', 'Failed')
+        ],
+        default='pending'
+    )
+    thumbnails = models.JSONField(_('thumbnails'), default=dict, blank=True, help_text='{"small": "books/thumbnails/..."}')
+    page_count = models.PositiveIntegerField(_('page count'), null=True, blank=True)
+    file_size = models.PositiveBigIntegerField(_('file size'), null=True, blank=True, help_text='Size in bytes')
     status = models.CharField(
         _('status'),
         max_length=20,
@@ -0,0 +1,99 @@
+"""
+Kitob preview'lari.
+
+Yuklangan PDF'dan birinchi LIBRARY_PREVIEW_PAGES sahifa preview_file'ga
+ko'chiriladi, muqovadan LIBRARY_THUMBNAIL_SIZES o'lchamlarida JPEG
+thumbnail'lar yasaladi, sahifalar soni va fayl hajmi yoziladi. Ro'yxat
+sahifasi asl faylga murojaat qilmasdan muqova va hajmni ko'rsatadi.
+
+Fayllar kitob faylining storage'ida saqlanadi; qayta yaratishda eski
+thumbnail'lar va avtomatik yaratilgan preview avval o'chiriladi.
+"""
+import io
+import logging
+import os
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+from core.cache import bump_namespace
+from .models import Book
+
+logger = logging.getLogger(__name__)
+
+# Muqova eng katta thumbnail uchun shu kenglikda render qilinadi
+COVER_RENDER_WIDTH = max(settings.LIBRARY_THUMBNAIL_SIZES.values())
+
+
+def _render_cover(page):
+    import pymupdf
+
+    zoom = COVER_RENDER_WIDTH / page.rect.width
+    pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+    return Image.open(io.BytesIO(pixmap.tobytes('png'))).convert('RGB')
+
+
+def _delete_thumbnails(book):
+    for name in book.thumbnails.values():
+        book.file.storage.delete(name)
+
+
+def _save_thumbnails(book, cover):
+    # Eski fayllar o'chirilmasa storage yangi nomga suffiks qo'shadi va ular yetim qoladi
+    _delete_thumbnails(book)
+    thumbnails = {}
+    for label, width in settings.LIBRARY_THUMBNAIL_SIZES.items():
+        image = cover.copy()
+        image.thumbnail((width, width * 2))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=85, optimize=True)
+        name = book.file.storage.save(f'books/thumbnails/{book.pk}_{label}.jpg', ContentFile(buffer.getvalue()))
+        thumbnails[label] = name
+    return thumbnails
+
+
+def preview_name(book):
+    return f'books/previews/{book.pk}.pdf'
+
+
+def is_generated_preview(book):
+    """Admin yuklagan preview saqlanadi, avtomatik yaratilgani qayta yaratiladi"""
+    return bool(book.preview_file) and book.preview_file.name.startswith(preview_name(book)[:-len('.pdf')])
+
+
+def generate_preview(book_id):
+    """Kitob uchun preview, thumbnail'lar va metama'lumotlarni yaratish"""
+    book = Book.objects.get(pk=book_id)
+    updates = {'file_size': book.file.size}
+
+    if os.path.splitext(book.file.name)[1].lower() != '.pdf':
+        # Oldingi PDF'dan qolgan thumbnail'lar yangi faylga tegishli emas
+        _delete_thumbnails(book)
+        updates.update(preview_status='skipped', thumbnails={}, page_count=None)
+    else:
+        # PyMuPDF og'ir kutubxona - faqat worker'da yuklanadi
+        import pymupdf
+
+        with book.file.open('rb') as file:
+            document = pymupdf.open(stream=file.read(), filetype='pdf')
+        try:
+            updates['page_count'] = document.page_count
+            if (not book.preview_file or is_generated_preview(book)) and document.page_count:
+                storage = book.preview_file.storage
+                if book.preview_file:
+                    storage.delete(book.preview_file.name)
+                preview = pymupdf.open()
+                preview.insert_pdf(document, to_page=min(settings.LIBRARY_PREVIEW_PAGES, document.page_count) - 1)
+                updates['preview_file'] = storage.save(
+                    preview_name(book), ContentFile(preview.tobytes(garbage=3, deflate=True))
+                )
+                preview.close()
+            if document.page_count:
+                updates['thumbnails'] = _save_thumbnails(book, _render_cover(document[0]))
+        finally:
+            document.close()
+        updates['preview_status'] = 'ready'
+
+    # update(): post_save signali qayta ishga tushmaydi va boshqa maydonlar ustiga yozilmaydi
+    Book.objects.filter(pk=book_id).update(**updates)
+    bump_namespace('library')
+    return updates['preview_status']
@@ -1,12 +1,17 @@
 from rest_framework import serializers
 from .models import Book, BookPurchase, BookDownload
 from apps.courses.serializers import CategorySerializer
+from .counters import pending_downloads
+from .entitlements import EMPTY_ENTITLEMENTS, get_request_entitlements, is_purchased
+from .signing import signed_file_url
 
 class BookSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     is_downloaded = serializers.SerializerMethodField()
     final_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     preview_url = serializers.SerializerMethodField()
+    download_count = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
     
     class Meta:
         model = Book
@@ -21,15 +26,36 @@ class BookSerializer(serializers.ModelSerializer):
             'discount',
             'final_price',
             'preview_url',
+            'thumbnails',
+            'page_count',
+            'file_size',
             'upload_date',
+            'download_count',
             'is_downloaded'
         ]
     
+    def get_entitlements(self):
+        request = self.context.get('request')
+        if request is None:
+            return EMPTY_ENTITLEMENTS
+        return get_request_entitlements(request)
+
     def get_is_downloaded(self, obj):
+        return str(obj.pk) in self.get_entitlements()['downloaded']
+
+    def get_download_count(self, obj):
+        # Bazadagi qiymat + hali yozilmagan yuklashlar (bufer bir so'rovda bir marta o'qiladi)
+        if 'pending_downloads' not in self.context:
+            self.context['pending_downloads'] = pending_downloads()
+        return obj.download_count + self.context['pending_downloads'].get(str(obj.pk), 0)
+
+    def get_thumbnails(self, obj):
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.downloads.filter(user=request.user).exists()
-        return False
+        # Thumbnail'lar kitob fayli storage'ida saqlanadi
+        urls = {label: obj.file.storage.url(name) for label, name in obj.thumbnails.items()}
+        if request:
+            urls = {label: request.build_absolute_uri(url) for label, url in urls.items()}
+        return urls
 
     def get_preview_url(self, obj):
         if obj.preview_file:
@@ -45,20 +71,16 @@ class BookDetailSerializer(BookSerializer):
     
     def get_file_url(self, obj):
         request = self.context['request']
-        user = request.user
         
         # Free book or user has purchased
-        if obj.status == 'free' or obj.purchases.filter(user=user).exists():
-            return request.build_absolute_uri(obj.file.url)
+        if obj.status == 'free' or is_purchased(self.get_entitlements(), obj):
+            return signed_file_url(request, obj, request.user)
         return None
     
     def get_purchase_required(self, obj):
-        request = self.context['request']
-        user = request.user
-        
         if obj.status == 'free':
             return False
-        return not obj.purchases.filter(user=user).exists()
+        return not is_purchased(self.get_entitlements(), obj)
 
 class BookCreateSerializer(serializers.ModelSerializer):
     class Meta:
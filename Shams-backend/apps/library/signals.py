@@ -0,0 +1,60 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from core.cache import bump_namespace, user_namespace
+from .models import Book, BookPurchase, BookDownload
+from .tasks import generate_book_preview
+from .entitlements import invalidate_entitlements
+from .signing import revoke_file_tokens
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_cache(sender, instance, **kwargs):
+    bump_namespace('library')
+
+@receiver(post_save, sender=Book)
+def revoke_inactive_book_file_tokens(sender, instance, created, **kwargs):
+    """Nofaol kitobning imzolangan havolalari ishlamaydi"""
+    if not created and not instance.is_active:
+        revoke_file_tokens(instance.pk)
+
+@receiver(post_delete, sender=Book)
+def revoke_deleted_book_file_tokens(sender, instance, **kwargs):
+    revoke_file_tokens(instance.pk)
+
+@receiver(post_delete, sender=BookPurchase)
+def revoke_purchase_file_tokens(sender, instance, **kwargs):
+    """Bekor qilingan xarid bo'yicha berilgan havolalar ishlamaydi"""
+    revoke_file_tokens(instance.book_id, instance.user_id)
+
+@receiver(pre_save, sender=Book)
+def reset_book_preview(sender, instance, update_fields=None, **kwargs):
+    """Fayl almashtirilsa preview va metama'lumotlar eskiradi"""
+    instance._file_changed = False
+    if instance._state.adding or (update_fields is not None and 'file' not in update_fields):
+        return
+    previous = Book.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+    if previous is not None and previous != instance.file.name:
+        instance._file_changed = True
+        instance.preview_status = 'pending'
+        instance.file_size = None
+        instance.page_count = None
+
+@receiver(post_save, sender=Book)
+def schedule_book_preview(sender, instance, created, **kwargs):
+    """Yangi yoki almashtirilgan fayl uchun preview va thumbnail'larni fonda yaratish"""
+    if not instance.file or not (created or instance._file_changed):
+        return
+    if instance._file_changed:
+        # Eski fayl bo'yicha berilgan havolalar endi yo'q faylga olib boradi
+        revoke_file_tokens(instance.pk)
+    transaction.on_commit(lambda: generate_book_preview.delay(str(instance.pk)))
+
+@receiver(post_save, sender=BookPurchase)
+@receiver(post_delete, sender=BookPurchase)
+@receiver(post_save, sender=BookDownload)
+@receiver(post_delete, sender=BookDownload)
+def invalidate_user_library_cache(sender, instance, **kwargs):
+    """Drop the user's cached book responses and entitlement sets (is_downloaded / file_url)"""
+    bump_namespace(user_namespace('library', instance.user_id))
+    invalidate_entitlements(instance.user_id)
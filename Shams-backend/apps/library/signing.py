@@ -0,0 +1,79 @@
+"""
+Kitob fayllari uchun imzolangan, muddatli havolalar.
+
+Havola kitob, foydalanuvchi va fayl nomini o'z ichiga olgan HMAC imzoli
+token bilan beriladi. Token bearer token: havolani bilgan har kim uni muddati
+tugaguncha ishlata oladi (brauzer va yuklab olish dasturlari Authorization
+sarlavhasini yubormaydi), shuning uchun muddat qisqa. Huquq havola
+berilayotganda tekshiriladi; faylni uzatishda (har bir Range so'rovida)
+bazaga murojaat qilinmaydi. Kitob o'chirilsa yoki xarid bekor qilinsa
+bekor qilish vaqti keshga token muddaticha yoziladi va undan oldin berilgan
+havolalar rad etiladi.
+
+Fayllar S3'da saqlansa havola to'g'ridan-to'g'ri django-storages orqali
+presign qilinadi. Lokal saqlashda MEDIA_ROOT (books/...) productionda ochiq
+berilmasligi kerak, aks holda fayllarga token'siz kirish mumkin.
+"""
+import time
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:
+    S3Storage = None
+
+SALT = 'library.book-file'
+
+
+class InvalidFileToken(Exception):
+    pass
+
+
+def revoked_keys(book_id, user_id):
+    """Kitob va foydalanuvchi-kitob bo'yicha bekor qilish vaqtlari kalitlari"""
+    return [f'library:file-revoked:{book_id}', f'library:file-revoked:{book_id}:{user_id or "anon"}']
+
+
+def revoke_file_tokens(book_id, user_id=None):
+    """Kitob (yoki foydalanuvchining shu kitobdagi) hozirgacha berilgan havolalarini bekor qilish"""
+    keys = revoked_keys(book_id, user_id)
+    # Undan eski token'lar baribir muddati tugagani uchun rad etiladi
+    cache.set(keys[1] if user_id else keys[0], time.time(), settings.LIBRARY_SIGNED_URL_TTL)
+
+
+def make_file_token(book, user):
+    return signing.dumps(
+        {'b': str(book.pk), 'u': str(user.pk) if user.pk else None, 'f': book.file.name, 't': time.time()},
+        salt=SALT,
+        compress=True
+    )
+
+
+def read_file_token(token):
+    """Token'ni tekshirish: {'b': book_id, 'u': user_id, 'f': fayl nomi, 't': berilgan vaqt}"""
+    try:
+        return signing.loads(token, salt=SALT, max_age=settings.LIBRARY_SIGNED_URL_TTL)
+    except signing.BadSignature:
+        raise InvalidFileToken
+
+
+def resolve_file_token(token):
+    """Token bo'yicha fayl nomini qaytarish (imzo, muddat va keshdagi bekor qilish; bazaga murojaatsiz)"""
+    payload = read_file_token(token)
+    revoked = cache.get_many(revoked_keys(payload['b'], payload['u'])).values()
+    if 't' not in payload or any(revoked_at >= payload['t'] for revoked_at in revoked):
+        raise InvalidFileToken
+    return payload['f']
+
+
+def signed_file_url(request, book, user):
+    """Kitob fayli uchun qisqa muddatli havola"""
+    storage = book.file.storage
+    if S3Storage is not None and isinstance(storage, S3Storage):
+        return storage.url(book.file.name, expire=settings.LIBRARY_SIGNED_URL_TTL)
+    return request.build_absolute_uri(
+        reverse('library:book-file-signed', args=[make_file_token(book, user)])
+    )
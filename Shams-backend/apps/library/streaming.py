@@ -0,0 +1,137 @@
+"""
+Kitob fayllarini HTTP Range bilan uzatish.
+
+Bitta "bytes=" oralig'i (Range) va If-Range qo'llab-quvvatlanadi: yuklashni
+davom ettirish va PDF'ni qisman yuklash uchun shu yetarli. Bir nechta
+oraliq so'ralsa butun fayl 200 bilan qaytariladi (RFC 9110 ruxsat beradi).
+
+LIBRARY_FILE_OFFLOAD sozlansa fayl Django worker'lari orqali emas,
+veb-server tomonidan uzatiladi:
+    'nginx'  - X-Accel-Redirect: LIBRARY_ACCEL_REDIRECT_PREFIX + fayl nomi
+    'apache' - X-Sendfile: fayl yo'li (faqat lokal storage)
+"""
+import hashlib
+import mimetypes
+import os
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """'bytes=a-b' -> (start, end) (end ham kiradi); qo'llab-quvvatlanmasa None"""
+    if not header or not header.startswith('bytes='):
+        return None
+    ranges = header[len('bytes='):].split(',')
+    if len(ranges) != 1:
+        return None
+    start, _, end = ranges[0].strip().partition('-')
+    try:
+        if not start:
+            # bytes=-N: oxirgi N bayt
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def file_etag(name, size, last_modified):
+    raw = f'{name}:{size}:{last_modified}'
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def if_range_matches(header, etag, last_modified):
+    if not header:
+        return True
+    if header.startswith('"'):
+        return header == etag
+    if_range_date = parse_http_date_safe(header)
+    return if_range_date is not None and if_range_date >= int(last_modified)
+
+
+def _iter_file(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def _content_disposition(name, attachment):
+    filename = os.path.basename(name)
+    disposition = 'attachment' if attachment else 'inline'
+    return f"{disposition}; filename*=UTF-8''{quote(filename)}"
+
+
+def offload_response(name, storage, attachment=False):
+    """Faylni veb-serverga topshirish (sozlanmagan bo'lsa None)"""
+    offload = settings.LIBRARY_FILE_OFFLOAD
+    if offload == 'nginx':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(settings.LIBRARY_ACCEL_REDIRECT_PREFIX + name)
+    elif offload == 'apache':
+        response = HttpResponse()
+        response['X-Sendfile'] = storage.path(name)
+    else:
+        return None
+    # Content-Type va Range'ni veb-server o'zi belgilaydi
+    del response['Content-Type']
+    response['Content-Disposition'] = _content_disposition(name, attachment)
+    return response
+
+
+def file_response(request, name, storage=default_storage, attachment=False):
+    """Storage'dagi faylni Range/If-Range bilan qaytarish (bazaga murojaat qilmaydi)"""
+    response = offload_response(name, storage, attachment)
+    if response is not None:
+        return response
+
+    size = storage.size(name)
+    last_modified = storage.get_modified_time(name).timestamp()
+    etag = file_etag(name, size, last_modified)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    byte_range = None
+    if if_range_matches(request.META.get('HTTP_IF_RANGE'), etag, last_modified):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    stream = _iter_file(storage.open(name, 'rb'), start, length) if request.method != 'HEAD' else iter(())
+    response = StreamingHttpResponse(stream, status=206 if byte_range else 200, content_type=content_type)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = _content_disposition(name, attachment)
+    return response
@@ -0,0 +1,22 @@
+from celery import shared_task
+from .counters import flush_download_counts
+from .models import Book
+from .previews import generate_preview
+
+@shared_task
+def flush_book_download_counts():
+    """Buferdagi yuklab olishlar sonini Book.download_count'ga yozish"""
+    return flush_download_counts()
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30)
+def generate_book_preview(self, book_id):
+    """Kitob preview'i va muqova thumbnail'larini yaratish"""
+    try:
+        return generate_preview(book_id)
+    except Book.DoesNotExist:
+        return None
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            Book.objects.filter(pk=book_id).update(preview_status='failed')
+            raise
+        raise self.retry(exc=exc)
@@ -1,3 +1,271 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from core.celery import app as celery_app
+from core.kv import get_store
+from .counters import PENDING_DOWNLOADS_KEY, flush_download_counts, pending_downloads, record_download
+from .models import Book, BookPurchase
+from .previews import generate_preview
 
-# Create your tests here.
+
+class LibraryTestMixin:
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('reader@example.com', 'secret', username='reader', full_name='Reader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_book(self, content=b'0123456789' * 10, **kwargs):
+        kwargs.setdefault('status', 'free')
+        return Book.objects.create(
+            title='Kitob', author='Muallif', description='Tavsif', uploaded_by=self.user,
+            file=SimpleUploadedFile('book.txt', content), **kwargs
+        )
+
+
+class ConditionalGetTests(LibraryTestMixin, TestCase):
+    def test_list_answers_304_without_queries(self):
+        self.create_book()
+        response = self.client.get('/api/library/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Authorization', response['Vary'])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/library/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        # Xarid foydalanuvchi nom maydonini, yangi kitob umumiy nom maydonini yangilaydi
+        paid = self.create_book(status='paid', price=10)
+        self.assertEqual(self.client.get('/api/library/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        etag = self.client.get('/api/library/')['ETag']
+        BookPurchase.objects.create(user=self.user, book=paid, paid_amount=10, payment_method='payme', transaction_id='T1')
+        self.assertNotEqual(self.client.get('/api/library/')['ETag'], etag)
+
+    @override_settings(LIBRARY_SIGNED_URL_TTL=300)
+    def test_detail_etag_changes_before_signed_url_expires(self):
+        book = self.create_book()
+        url = f'/api/library/{book.pk}/'
+        with mock.patch('apps.library.views.time.time', return_value=1000):
+            response = self.client.get(url)
+            self.assertTrue(response.data['file_url'])
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        # Muddatning yarmi o'tgach 304 o'rniga yangi havola beriladi
+        with mock.patch('apps.library.views.time.time', return_value=1000 + 150):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+@override_settings(LIBRARY_SIGNED_URL_TTL=300, LIBRARY_FILE_OFFLOAD='')
+class SignedFileTests(LibraryTestMixin, TestCase):
+    def file_url(self, book):
+        return self.client.get(f'/api/library/{book.pk}/').data['file_url']
+
+    def test_signed_file_is_served_without_queries(self):
+        book = self.create_book(content=b'kitob matni')
+        url = self.file_url(book)
+        self.client.force_authenticate(None)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'kitob matni')
+
+    def test_expired_and_forged_tokens_are_rejected(self):
+        book = self.create_book()
+        url = self.file_url(book)
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 301):
+            self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url[:-3] + 'xx/').status_code, 403)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_revoked_purchase_and_inactive_book(self):
+        book = self.create_book(status='paid', price=10)
+        self.assertIsNone(self.file_url(book))
+        with self.captureOnCommitCallbacks(execute=True):
+            purchase = BookPurchase.objects.create(
+                user=self.user, book=book, paid_amount=10, payment_method='payme', transaction_id='T1'
+            )
+        url = self.file_url(book)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        purchase.delete()
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        free = self.create_book()
+        url = self.file_url(free)
+        free.is_active = False
+        free.save()
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class DownloadCounterTests(LibraryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        get_store().delete(PENDING_DOWNLOADS_KEY)
+
+    def test_flush_adds_pending_counts(self):
+        book = self.create_book()
+        record_download(book.pk)
+        record_download(book.pk)
+        self.assertEqual(self.client.get(f'/api/library/{book.pk}/').data['download_count'], 2)
+
+        self.assertEqual(flush_download_counts(), 1)
+        book.refresh_from_db()
+        self.assertEqual(book.download_count, 2)
+        self.assertEqual(pending_downloads(), {})
+        self.assertEqual(self.client.get(f'/api/library/{book.pk}/').data['download_count'], 2)
+
+    def test_failed_flush_requeues_counts(self):
+        first = self.create_book()
+        second = self.create_book()
+        record_download(first.pk)
+        record_download(second.pk)
+        updates = []
+
+        def fail_on_second_book(self_, **kwargs):
+            updates.append(kwargs)
+            if len(updates) == 2:
+                record_download(first.pk)
+                raise DatabaseError('connection lost')
+            return original_update(self_, **kwargs)
+
+        original_update = QuerySet.update
+        with mock.patch.object(QuerySet, 'update', fail_on_second_book):
+            with self.assertRaises(DatabaseError):
+                flush_download_counts()
+        # Birinchi kitobning yozuvi ham bekor bo'ldi: hisob ikki marta qo'shilmaydi
+        first.refresh_from_db()
+        self.assertEqual(first.download_count, 0)
+        self.assertEqual(pending_downloads(), {str(first.pk): 2, str(second.pk): 1})
+
+        flush_download_counts()
+        first.refresh_from_db()
+        self.assertEqual(first.download_count, 2)
+
+
+def make_pdf(pages=3):
+    import pymupdf
+
+    document = pymupdf.open()
+    for _ in range(pages):
+        document.new_page(width=200, height=300)
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+@override_settings(LIBRARY_PREVIEW_PAGES=2)
+class PreviewTests(LibraryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', eager)
+
+    def create_pdf_book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Book.objects.create(
+                title='Kitob', author='Muallif', description='Tavsif', status='free', uploaded_by=self.user,
+                file=SimpleUploadedFile('book.pdf', make_pdf())
+            )
+
+    def test_replacing_file_regenerates_renditions_in_book_storage(self):
+        book = self.create_pdf_book()
+        book.refresh_from_db()
+        self.assertEqual(book.preview_status, 'ready')
+        self.assertEqual(book.page_count, 3)
+        storage = book.file.storage
+        old_thumbnails = dict(book.thumbnails)
+        self.assertTrue(all(storage.exists(name) for name in old_thumbnails.values()))
+
+        with mock.patch('apps.library.signals.generate_book_preview.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                book.file = SimpleUploadedFile('book.txt', b'matn')
+                book.save()
+        delay.assert_called_once_with(str(book.pk))
+        book.refresh_from_db()
+        self.assertEqual(book.preview_status, 'pending')
+        self.assertIsNone(book.page_count)
+
+        # Boshqa maydonlarni saqlash preview'ni qayta yaratmaydi
+        with mock.patch('apps.library.signals.generate_book_preview.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                book.title = 'Yangi nom'
+                book.save()
+        delay.assert_not_called()
+
+        generate_preview(book.pk)
+        book.refresh_from_db()
+        self.assertEqual(book.preview_status, 'skipped')
+        self.assertEqual(book.thumbnails, {})
+        self.assertFalse(any(storage.exists(name) for name in old_thumbnails.values()))
+
+    def test_regeneration_replaces_old_files(self):
+        book = self.create_pdf_book()
+        book.refresh_from_db()
+        thumbnails, preview = dict(book.thumbnails), book.preview_file.name
+
+        generate_preview(book.pk)
+        book.refresh_from_db()
+        # Eski fayllar o'chirilgani uchun nomlar suffikssiz qayta ishlatiladi
+        self.assertEqual(book.thumbnails, thumbnails)
+        self.assertEqual(book.preview_file.name, preview)
+
+        data = self.client.get(f'/api/library/{book.pk}/').data
+        self.assertEqual(data['thumbnails']['small'], f'http://testserver{book.file.storage.url(thumbnails["small"])}')
+
+
+@override_settings(LIBRARY_FILE_OFFLOAD='')
+class RangeTests(LibraryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.book = self.create_book(content=bytes(range(100)))
+        self.url = f'/api/library/{self.book.pk}/file/'
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_partial_and_suffix_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(self.body(response), bytes(range(10, 20)))
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(self.body(response), bytes(range(95, 100)))
+        response = self.client.get(self.url, HTTP_RANGE='bytes=90-500')
+        self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+
+        # Bir nechta oraliq: butun fayl 200 bilan
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-1,5-6')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.body(response)), 100)
+
+    def test_unsatisfiable_range_and_if_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+        etag = self.client.get(self.url)['ETag']
+        resumed = self.client.get(self.url, HTTP_RANGE='bytes=50-', HTTP_IF_RANGE=etag)
+        self.assertEqual(resumed.status_code, 206)
+        # Fayl o'zgargan bo'lsa (ETag mos emas) butun fayl qaytariladi
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=50-', HTTP_IF_RANGE='"eski"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(len(self.body(stale)), 100)
+
+    def test_paid_book_requires_purchase(self):
+        book = self.create_book(status='paid', price=10)
+        self.assertEqual(self.client.get(f'/api/library/{book.pk}/file/').status_code, 403)
@@ -4,7 +4,9 @@ from .views import (
     BookDetailView,
     BookPurchaseView,
     BookDownloadView,
-    MyBooksListView
+    MyBooksListView,
+    BookFileView,
+    BookSignedFileView
 )
 
 app_name = 'library'
@@ -12,8 +14,10 @@ app_name = 'library'
 urlpatterns = [
     # Book URLs
     path('', BookListView.as_view(), name='book-list'),
-    path('<int:pk>/', BookDetailView.as_view(), name='book-detail'),
-    path('<int:pk>/purchase/', BookPurchaseView.as_view(), name='book-purchase'),
-    path('<int:pk>/download/', BookDownloadView.as_view(), name='book-download'),
+    path('<uuid:pk>/', BookDetailView.as_view(), name='book-detail'),
+    path('<uuid:pk>/purchase/', BookPurchaseView.as_view(), name='book-purchase'),
+    path('<uuid:pk>/download/', BookDownloadView.as_view(), name='book-download'),
+    path('<uuid:pk>/file/', BookFileView.as_view(), name='book-file'),
+    path('files/<str:token>/', BookSignedFileView.as_view(), name='book-file-signed'),
     path('my-books/', MyBooksListView.as_view(), name='my-books'),
 ] 
\ No newline at end of file
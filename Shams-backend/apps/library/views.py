@@ -11,10 +11,22 @@ from .serializers import (
     BookUpdateSerializer, BookPurchaseSerializer, BookPurchaseCreateSerializer,
     BookDownloadSerializer
 )
+import time
 import uuid
+from django.conf import settings
 from apps.accounts.models import UserActivity
+from core.cache import ConditionalGetMixin
+from django.http import HttpResponseForbidden
+from django.views import View
+from .counters import record_download
+from .entitlements import get_request_entitlements, has_access, is_purchased
+from .signing import InvalidFileToken, resolve_file_token, signed_file_url
+from .streaming import file_response
 
-class BookListView(generics.ListCreateAPIView):
+class BookListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    # is_downloaded foydalanuvchiga bog'liq
+    cache_namespaces = ('library', 'categories')
+    cache_user_namespace = 'library'
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.AllowAny]
@@ -46,12 +58,19 @@ class BookListView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(uploaded_by=self.request.user)
 
-class BookDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BookDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_namespaces = ('library', 'categories')
+    cache_user_namespace = 'library'
     queryset = Book.objects.all()
     serializer_class = BookDetailSerializer
     permission_classes = [permissions.AllowAny]
     parser_classes = [MultiPartParser, FormParser]
 
+    def get_cache_parts(self, request):
+        # file_url muddatli: ETag muddatning yarmida almashadi, 304 eskirgan havolani qoldirmaydi
+        window = max(settings.LIBRARY_SIGNED_URL_TTL // 2, 1)
+        return super().get_cache_parts(request) + [int(time.time() // window)]
+
     def get_queryset(self):
         return Book.objects.filter(is_active=True)
 
@@ -73,7 +92,7 @@ class BookPurchaseView(generics.CreateAPIView):
         book = get_object_or_404(Book, pk=kwargs['pk'])
         
         # Check if already purchased
-        if book.purchases.filter(user=request.user).exists():
+        if is_purchased(get_request_entitlements(request), book):
             return Response(
                 {'detail': 'You have already purchased this book'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -99,7 +118,7 @@ class BookPurchaseView(generics.CreateAPIView):
         return Response({
             'success': True,
             'message': 'Book purchased successfully',
-            'file_url': request.build_absolute_uri(book.file.url)
+            'file_url': signed_file_url(request, book, request.user)
         }, status=status.HTTP_201_CREATED)
 
 class MyBooksListView(generics.ListAPIView):
@@ -121,7 +140,7 @@ class BookDownloadView(generics.CreateAPIView):
         book = get_object_or_404(Book, pk=kwargs['pk'])
         
         # Check if user can download
-        if book.status != 'free' and not book.purchases.filter(user=request.user).exists():
+        if not has_access(request.user, book, get_request_entitlements(request)):
             return Response(
                 {'detail': 'You need to purchase this book first'},
                 status=status.HTTP_403_FORBIDDEN
@@ -142,16 +161,45 @@ class BookDownloadView(generics.CreateAPIView):
             ip_address=request.META.get('REMOTE_ADDR')
         )
         
-        # Increment download count
-        book.download_count += 1
-        book.save()
+        # Increment download count (bufer orqali, Book qatori qayta yozilmaydi)
+        record_download(book.pk)
         
         return Response({
             'success': True,
             'message': 'Download started',
-            'file_url': request.build_absolute_uri(book.file.url)
+            'file_url': signed_file_url(request, book, request.user)
         }, status=status.HTTP_201_CREATED)
 
+class BookFileView(generics.GenericAPIView):
+    """Kitob faylini uzatish (Range bilan davom ettirish va qisman yuklash)"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        book = get_object_or_404(Book, pk=kwargs['pk'], is_active=True)
+        if not has_access(request.user, book, get_request_entitlements(request)):
+            return Response(
+                {'detail': 'You need to purchase this book first'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return file_response(
+            request, book.file.name, book.file.storage,
+            attachment=request.query_params.get('download') == '1'
+        )
+
+class BookSignedFileView(View):
+    """Imzolangan havola bo'yicha faylni uzatish (bearer token, autentifikatsiyasiz)"""
+
+    def get(self, request, token):
+        try:
+            name = resolve_file_token(token)
+        except InvalidFileToken:
+            return HttpResponseForbidden('Havola yaroqsiz yoki muddati tugagan')
+        # Storage maydondan olinadi: kitob qatori o'qilmaydi
+        return file_response(
+            request, name, Book.file.field.storage,
+            attachment=request.GET.get('download') == '1'
+        )
+
 class BookViewSet(viewsets.ReadOnlyModelViewSet):
     """Kitoblar"""
     queryset = Book.objects.filter(is_active=True)
@@ -171,7 +219,7 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         book = self.get_object()
         
         # Yuklashni tekshirish
-        if book.downloads.filter(user=request.user).exists():
+        if str(book.pk) in get_request_entitlements(request)['downloaded']:
             return Response(
                 {'detail': 'Siz allaqachon bu kitobni yuklagansiz'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -183,6 +231,8 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
             book=book
         )
         
+        record_download(book.pk)
+        
         # Faoliyat yaratish
         UserActivity.objects.create(
             user=request.user,
@@ -23,6 +23,9 @@ class Notification(models.Model):
         verbose_name = 'Xabarnoma'
         verbose_name_plural = 'Xabarnomalar'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} - {self.get_type_display()}' 
\ No newline at end of file
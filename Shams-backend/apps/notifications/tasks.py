@@ -4,6 +4,8 @@ from django.conf import settings
 from .models import Notification
 from apps.accounts.models import User
 from apps.payments.models import Payment
+from apps.courses.models import Course
+from apps.tests.models import Test
 
 @shared_task
 def send_welcome_email(user_id):
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.cache import cache
+from core.pagination import CreatedAtCursorPagination
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -10,6 +11,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """Xabarnomalar"""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
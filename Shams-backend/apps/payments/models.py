@@ -38,6 +38,9 @@ class Payment(models.Model):
         verbose_name = 'To\'lov'
         verbose_name_plural = 'To\'lovlar'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='payment_user_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} - {self.get_payment_type_display()} - {self.amount}'
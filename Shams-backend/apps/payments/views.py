@@ -11,11 +11,13 @@ from apps.accounts.models import UserActivity
 from apps.courses.models import Course
 from apps.library.models import Book
 from apps.notifications.tasks import send_payment_notification
+from core.pagination import CreatedAtCursorPagination
 
 class PaymentViewSet(viewsets.ModelViewSet):
     """To'lovlar"""
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         return Payment.objects.filter(user=self.request.user)
@@ -113,8 +115,9 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def history(self, request):
         """To'lov tarixi"""
         payments = self.get_queryset()
-        serializer = PaymentSerializer(payments, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(payments)
+        serializer = PaymentSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def webhook(self, request, pk=None):
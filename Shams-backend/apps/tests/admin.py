@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Test, Question, Option, TestResult, UserAnswer
+from .models import Test, Question, Option, TestResult, UserAnswer, TestAttempt, TestStatistic, QuestionStatistic
 
 class OptionInline(admin.TabularInline):
     model = Option
@@ -14,14 +14,15 @@ class TestAdmin(admin.ModelAdmin):
     fieldsets = (
         (None, {'fields': ('title', 'description')}),
         ('Kategoriya va Vaqt', {'fields': ('category', 'time_limit')}),
+        ('Savollar banki', {'fields': ('sample_size', 'sample_strata')}),
         ('Status', {'fields': ('is_active',)}),
         ('Yaratuvchi', {'fields': ('created_by',)}),
     )
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ('test', 'text', 'correct_option', 'created_at')
-    list_filter = ('test', 'created_at')
+    list_display = ('test', 'text', 'correct_option', 'difficulty', 'created_at')
+    list_filter = ('test', 'difficulty', 'created_at')
     search_fields = ('text', 'test__title')
     ordering = ('test', 'created_at')
     inlines = [OptionInline]
@@ -39,3 +40,23 @@ class UserAnswerAdmin(admin.ModelAdmin):
     list_filter = ('is_correct', 'created_at')
     search_fields = ('result__user__email', 'question__text')
     ordering = ('-created_at',)
+
+@admin.register(TestAttempt)
+class TestAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'test', 'status', 'started_at', 'deadline', 'submitted_at')
+    list_filter = ('status', 'started_at')
+    search_fields = ('user__email', 'test__title')
+    ordering = ('-started_at',)
+
+@admin.register(TestStatistic)
+class TestStatisticAdmin(admin.ModelAdmin):
+    list_display = ('test', 'results_count', 'mean_score', 'cronbach_alpha', 'computed_at')
+    search_fields = ('test__title',)
+    ordering = ('-computed_at',)
+
+@admin.register(QuestionStatistic)
+class QuestionStatisticAdmin(admin.ModelAdmin):
+    list_display = ('question', 'test', 'responses', 'difficulty', 'discrimination', 'computed_at')
+    list_filter = ('test',)
+    search_fields = ('question__text', 'test__title')
+    ordering = ('test', 'difficulty')
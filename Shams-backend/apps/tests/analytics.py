@@ -0,0 +1,179 @@
+"""
+Savollar tahlili (item analysis).
+
+Har bir test uchun berilgan (natija, savol) juftliklari va UserAnswer
+yozuvlari NumPy bilan vektorlashgan holda hisoblanadi. Bankdan tanlangan
+testlarda talaba faqat o'ziga berilgan savollar bo'yicha hisobga olinadi,
+shuning uchun natija x savol matritsasi yig'ilmaydi - yig'indilar juftliklar
+bo'yicha bincount bilan olinadi:
+
+- difficulty: savolga javob berganlar ichida to'g'ri javoblar ulushi;
+- discrimination: savol berilgan talabalar bo'yicha savol va qolgan ball
+  (umumiy ball - shu savol) orasidagi point-biserial korrelyatsiya;
+- distractors: har bir variant tanlangan ulush;
+- Cronbach alpha: test ishonchliligi (faqat hamma talabaga barcha savollar
+  berilgan bo'lsa).
+
+Faqat oxirgi hisoblashdan keyin yangi natijalar kelgan testlar qayta hisoblanadi.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q
+from .models import Test, Question, TestResult, UserAnswer, TestStatistic, QuestionStatistic
+
+
+def _nullable(values):
+    return [None if np.isnan(value) else round(float(value), 4) for value in values]
+
+
+def analyze(result_ids, question_ids, option_ids, correct, administered):
+    """
+    Bir test javoblari (har biri bitta UserAnswer) bo'yicha statistikani hisoblash.
+    administered - talabaga berilgan (result_id, question_id) juftliklari; berilgan,
+    lekin javobsiz qolgan savol noto'g'ri hisoblanadi.
+    Qaytaradi: (savollar, javoblar soni, difficulty, discrimination, distractors, alpha)
+    """
+    administered_results, administered_questions = (list(column) for column in zip(*administered))
+    answered = len(result_ids)
+    results, result_index = np.unique(
+        np.asarray(list(result_ids) + administered_results), return_inverse=True
+    )
+    questions, question_index = np.unique(
+        np.asarray(list(question_ids) + administered_questions), return_inverse=True
+    )
+    result_count, question_count = len(results), len(questions)
+
+    # Juftliklar bitta butun son kalitida: result * savollar soni + savol
+    keys = result_index * question_count + question_index
+    answer_keys = keys[:answered]
+    pair_keys = np.unique(keys)
+    pair_results, pair_questions = np.divmod(pair_keys, question_count)
+    scores = np.zeros(len(pair_keys))
+    scores[np.searchsorted(pair_keys, answer_keys)] = correct
+
+    answer_questions = question_index[:answered]
+    responses = np.bincount(answer_questions, minlength=question_count)
+    seen = np.bincount(pair_questions, minlength=question_count)
+
+    def per_question(weights):
+        return np.bincount(pair_questions, weights=weights, minlength=question_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        difficulty = np.bincount(answer_questions, weights=correct, minlength=question_count) / responses
+
+        totals = np.bincount(pair_results, weights=scores, minlength=result_count)
+        rest = totals[pair_results] - scores
+        sum_scores, sum_rest = per_question(scores), per_question(rest)
+        score_variance = per_question(scores ** 2) - sum_scores ** 2 / seen
+        rest_variance = per_question(rest ** 2) - sum_rest ** 2 / seen
+        covariance = per_question(scores * rest) - sum_scores * sum_rest / seen
+        discrimination = covariance / np.sqrt(score_variance * rest_variance)
+
+        # To'liq bo'lmagan dizaynda umumiy ballar turli savollardan - alpha ma'nosiz
+        alpha = None
+        complete = len(pair_keys) == result_count * question_count
+        if complete and question_count > 1 and result_count > 1:
+            total_variance = totals.var(ddof=1)
+            if total_variance > 0:
+                item_variance = (score_variance / (result_count - 1)).sum()
+                alpha = question_count / (question_count - 1) * (1 - item_variance / total_variance)
+
+    # Distraktorlar: (savol, variant) juftliklari bo'yicha sanash
+    distractors = [{} for _ in questions]
+    if answered:
+        pairs, counts = np.unique(
+            np.stack([answer_questions, np.asarray(option_ids)], axis=1), axis=0, return_counts=True
+        )
+        for (question, option), count in zip(pairs.tolist(), counts.tolist()):
+            distractors[question][str(option)] = round(count / responses[question], 4)
+
+    return (
+        questions,
+        responses,
+        _nullable(difficulty),
+        _nullable(discrimination),
+        distractors,
+        None if alpha is None else round(float(alpha), 4),
+    )
+
+
+def administered_pairs(test_id):
+    """Har bir baholangan natijaga berilgan (result_id, question_id) juftliklari"""
+    test_questions = [
+        str(question_id) for question_id in Question.objects.filter(test_id=test_id).values_list('id', flat=True)
+    ]
+    existing = set(test_questions)
+    pairs = []
+    results = TestResult.objects.filter(test_id=test_id, status='graded').values_list('id', 'question_ids')
+    for result_id, question_ids in results.iterator():
+        # Bo'sh question_ids - talabaga testning barcha savollari berilgan
+        if question_ids:
+            question_ids = [question_id for question_id in question_ids if question_id in existing]
+        else:
+            question_ids = test_questions
+        pairs.extend((str(result_id), question_id) for question_id in question_ids)
+    return pairs
+
+
+def compute_test_statistics(test_id):
+    """Bitta test statistikasini qayta hisoblash va saqlash"""
+    summary = TestResult.objects.filter(test_id=test_id, status='graded').aggregate(
+        count=Count('id'), mean=Avg('score'), last=Max('completed_at')
+    )
+    rows = list(UserAnswer.objects.filter(result__test_id=test_id, result__status='graded').values_list(
+        'result_id', 'question_id', 'selected_option_id', 'is_correct'
+    ))
+    administered = administered_pairs(test_id)
+
+    question_statistics = []
+    alpha = None
+    if administered:
+        result_ids, question_ids, option_ids, correct = zip(*rows) if rows else ((), (), (), ())
+        questions, responses, difficulty, discrimination, distractors, alpha = analyze(
+            [str(value) for value in result_ids],
+            [str(value) for value in question_ids],
+            option_ids,
+            np.asarray(correct, dtype=float),
+            administered
+        )
+        question_statistics = [
+            QuestionStatistic(
+                test_id=test_id,
+                question_id=question_id,
+                responses=int(responses[index]),
+                difficulty=difficulty[index],
+                discrimination=discrimination[index],
+                distractors=distractors[index],
+            )
+            for index, question_id in enumerate(questions.tolist())
+        ]
+
+    with transaction.atomic():
+        QuestionStatistic.objects.filter(test_id=test_id).delete()
+        QuestionStatistic.objects.bulk_create(question_statistics)
+        TestStatistic.objects.update_or_create(
+            test_id=test_id,
+            defaults={
+                'results_count': summary['count'],
+                'mean_score': summary['mean'],
+                'cronbach_alpha': alpha,
+                'last_result_at': summary['last'],
+            }
+        )
+    return len(question_statistics)
+
+
+def refresh_statistics():
+    """Yangi natijalari bor testlar statistikasini yangilash"""
+    stale = Test.objects.annotate(
+        last_result=Max('results__completed_at', filter=Q(results__status='graded'))
+    ).filter(
+        last_result__isnull=False
+    ).filter(
+        Q(statistic__last_result_at__isnull=True) | Q(statistic__last_result_at__lt=F('last_result'))
+    ).values_list('id', flat=True)
+
+    test_ids = list(stale)
+    for test_id in test_ids:
+        compute_test_statistics(test_id)
+    return len(test_ids)
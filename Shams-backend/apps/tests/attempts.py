@@ -0,0 +1,141 @@
+"""
+Test urinishlari.
+
+Urinish boshlanganda server Test.time_limit bo'yicha muddat belgilaydi.
+Javoblar har bir avtosaqlashda bazaga emas, tezkor omborga
+(tests:attempt:<id> -> {question_id: 'A'}) yoziladi; yakunlashda bufer bir
+marta o'qilib baholash uchun TestResult yaratiladi.
+"""
+import hashlib
+import random
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from core.kv import get_store
+from .grading import get_answer_key
+from .models import TestAttempt, TestResult
+
+# Tarmoq kechikishi uchun muddatdan keyingi qo'shimcha vaqt
+DEADLINE_GRACE = timedelta(seconds=30)
+
+
+class AttemptClosed(Exception):
+    """Urinish yakunlangan yoki muddati o'tgan"""
+
+
+def question_seed(user_id, test_id, attempt_id=None):
+    """Foydalanuvchi va urinish uchun barqaror seed"""
+    raw = f'{user_id}:{test_id}:{attempt_id or ""}'.encode()
+    return int.from_bytes(hashlib.sha256(raw).digest()[:8], 'big')
+
+
+def ordered_questions(questions, seed):
+    """Savollarni seed bo'yicha aralashtirish (qayta yuklanganda tartib o'zgarmaydi)"""
+    questions = sorted(questions, key=lambda question: str(question.pk))
+    random.Random(seed).shuffle(questions)
+    return questions
+
+
+def sample_questions(test, seed):
+    """
+    Savollar bankidan seed bo'yicha N ta savol tanlash (keshdagi id ro'yxatidan, O(N)).
+    Test bank rejimida bo'lmasa bo'sh ro'yxat - barcha savollar beriladi.
+    """
+    if not test.sample_strata and not test.sample_size:
+        return []
+    answer_key = get_answer_key(test.pk)
+    rng = random.Random(seed)
+    if test.sample_strata:
+        question_ids = []
+        for difficulty, size in sorted(test.sample_strata.items()):
+            pool = answer_key['by_difficulty'].get(difficulty, [])
+            question_ids.extend(rng.sample(pool, min(int(size), len(pool))))
+        return question_ids
+    if test.sample_size >= answer_key['count']:
+        return []
+    return rng.sample(answer_key['ids'], test.sample_size)
+
+
+def attempt_key(attempt_id):
+    return f'tests:attempt:{attempt_id}'
+
+
+def start_attempt(user, test):
+    """
+    Faol urinishni qaytarish yoki yangisini boshlash: (urinish, yangi_mi).
+    Muddati o'tgan faol urinish avval yakunlanadi; bir vaqtda bitta faol urinishni
+    attempt_one_in_progress sharti kafolatlaydi.
+    """
+    now = timezone.now()
+    stale = TestAttempt.objects.filter(
+        user=user, test=test, status='in_progress', deadline__lte=now
+    ).values_list('pk', flat=True)
+    for attempt_id in list(stale):
+        finalize_attempt(attempt_id, status='expired')
+
+    attempt = TestAttempt.objects.filter(user=user, test=test, status='in_progress').first()
+    if attempt is not None:
+        return attempt, False
+
+    attempt = TestAttempt(
+        user=user,
+        test=test,
+        deadline=now + timedelta(minutes=test.time_limit)
+    )
+    attempt.question_ids = sample_questions(test, question_seed(user.pk, test.pk, attempt.pk))
+    try:
+        with transaction.atomic():
+            attempt.save(force_insert=True)
+    except IntegrityError:
+        # Parallel so'rov urinishni bizdan oldin yaratdi
+        return TestAttempt.objects.get(user=user, test=test, status='in_progress'), False
+    return attempt, True
+
+
+def get_buffered_answers(attempt):
+    return get_store().hgetall(attempt_key(attempt.pk))
+
+
+def save_answers(attempt, answers):
+    """Javoblarni buferga yozish; noma'lum savollar uchun ValueError"""
+    if attempt.status != 'in_progress' or timezone.now() > attempt.deadline + DEADLINE_GRACE:
+        raise AttemptClosed
+    allowed = set(attempt.question_ids) if attempt.question_ids else get_answer_key(attempt.test_id)['answers']
+    unknown = [question_id for question_id in answers if question_id not in allowed]
+    if unknown:
+        raise ValueError(unknown)
+    if answers:
+        get_store().hset(attempt_key(attempt.pk), answers)
+    return len(answers)
+
+
+def finalize_attempt(attempt_id, status='submitted'):
+    """Buferdagi javoblarni baholashga yuborib urinishni yakunlash (takroriy chaqiruv xavfsiz)"""
+    store = get_store()
+    with transaction.atomic():
+        attempt = TestAttempt.objects.select_for_update().select_related('result').get(pk=attempt_id)
+        if attempt.status != 'in_progress':
+            return attempt
+        # Baholash Celery'da bajariladi (TestResult signali orqali)
+        attempt.result = TestResult.objects.create(
+            user_id=attempt.user_id,
+            test_id=attempt.test_id,
+            submitted_answers=store.hgetall(attempt_key(attempt.pk)),
+            question_ids=attempt.question_ids
+        )
+        attempt.status = status
+        attempt.submitted_at = timezone.now()
+        attempt.save(update_fields=['result', 'status', 'submitted_at'])
+        transaction.on_commit(lambda: store.delete(attempt_key(attempt.pk)))
+    return attempt
+
+
+def finalize_expired_attempts():
+    """Muddati o'tgan urinishlarni avtomatik topshirish"""
+    expired = list(TestAttempt.objects.filter(
+        status='in_progress',
+        deadline__lt=timezone.now() - DEADLINE_GRACE
+    ).values_list('pk', flat=True))
+    for attempt_id in expired:
+        finalize_attempt(attempt_id, status='expired')
+    return len(expired)
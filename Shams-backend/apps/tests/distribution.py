@@ -0,0 +1,75 @@
+"""
+Test ballari taqsimoti.
+
+score butun foiz bo'lgani uchun har bir test 101 ta ScoreBucket bilan
+ifodalanadi. Natija qo'shilganda tegishli bucket F() bilan oshiriladi;
+persentil, o'rtacha va median xom natijalarni aggregatsiya qilmasdan
+keshdagi gistogrammadan O(1) da olinadi.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import ScoreBucket
+
+DISTRIBUTION_TIMEOUT = 60 * 60
+MAX_SCORE = 100
+
+
+def distribution_cache_key(test_id):
+    return f'tests:distribution:{test_id}'
+
+
+def add_score(test_id, score, amount=1):
+    """Natijani gistogrammaga qo'shish (amount=-1 - olib tashlash)"""
+    score = min(max(int(score), 0), MAX_SCORE)
+    ScoreBucket.objects.bulk_create(
+        [ScoreBucket(test_id=test_id, score=score, count=0)], ignore_conflicts=True
+    )
+    ScoreBucket.objects.filter(test_id=test_id, score=score).update(count=F('count') + amount)
+    transaction.on_commit(lambda: cache.delete(distribution_cache_key(test_id)))
+
+
+def get_distribution(test_id):
+    """
+    {'counts': [101], 'below': [101], 'total': n, 'mean': x, 'median': y}
+    below[s] - s dan past ball olgan natijalar soni.
+    """
+    key = distribution_cache_key(test_id)
+    distribution = cache.get(key)
+    if distribution is None:
+        counts = [0] * (MAX_SCORE + 1)
+        for score, count in ScoreBucket.objects.filter(test_id=test_id).values_list('score', 'count'):
+            counts[score] = count
+
+        below = []
+        running = 0
+        for count in counts:
+            below.append(running)
+            running += count
+        total = running
+
+        median = None
+        if total:
+            # O'rtadagi bir yoki ikki qiymatning o'rtachasi
+            lower, upper = (total - 1) // 2, total // 2
+            lower_score = next(score for score in range(MAX_SCORE + 1) if below[score] + counts[score] > lower)
+            upper_score = next(score for score in range(MAX_SCORE + 1) if below[score] + counts[score] > upper)
+            median = (lower_score + upper_score) / 2
+
+        distribution = {
+            'counts': counts,
+            'below': below,
+            'total': total,
+            'mean': round(sum(score * count for score, count in enumerate(counts)) / total, 2) if total else None,
+            'median': median,
+        }
+        cache.set(key, distribution, DISTRIBUTION_TIMEOUT)
+    return distribution
+
+
+def get_percentile(distribution, score):
+    """Shu balldan past natijalar ulushi (foizda)"""
+    if not distribution['total']:
+        return None
+    score = min(max(int(score), 0), MAX_SCORE)
+    return round(100 * distribution['below'][score] / distribution['total'], 1)
@@ -0,0 +1,52 @@
+"""
+Test natijasi uchun izoh (feedback).
+
+Generator sozlamalarda TEST_FEEDBACK_GENERATOR orqali almashtiriladi
+(masalan, AI asosidagi generator). Standart generator tashqi xizmatlarsiz
+va deterministik ishlaydi.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DIFFICULTY_LABELS = {
+    'easy': 'oson',
+    'medium': "o'rtacha",
+    'hard': 'qiyin',
+}
+
+
+def score_message(score):
+    if score >= 90:
+        return "Ajoyib natija!"
+    elif score >= 80:
+        return "Yaxshi natija!"
+    elif score >= 70:
+        return "Yaxshi!"
+    elif score >= 60:
+        return "Qoniqarli!"
+    else:
+        return "Qayta urinib ko'ring!"
+
+
+def generate_feedback(result, correct, total, missed_by_difficulty):
+    """Ball va qiyinlik bo'yicha xatolar asosida izoh"""
+    lines = [
+        score_message(result.score),
+        f"{total} ta savoldan {correct} tasiga to'g'ri javob berdingiz ({result.score}%)."
+    ]
+    missed = [
+        f"{DIFFICULTY_LABELS.get(difficulty, difficulty)} - {count} ta"
+        for difficulty, count in sorted(missed_by_difficulty.items())
+        if count
+    ]
+    if missed:
+        lines.append(f"Xato javoblar: {', '.join(missed)}.")
+    if missed_by_difficulty.get('easy'):
+        lines.append("Asosiy mavzularni takrorlashni tavsiya qilamiz.")
+    elif missed_by_difficulty.get('hard'):
+        lines.append("Murakkab savollar ustida ko'proq ishlang.")
+    return '\n'.join(lines)
+
+
+def get_feedback_generator():
+    return import_string(settings.TEST_FEEDBACK_GENERATOR)
@@ -0,0 +1,167 @@
+"""
+Testlarni baholash.
+
+Har bir test uchun kalit (question_id -> correct_option, variantlar va
+to'g'ri variantlar, savollar soni) bir marta yig'iladi va keshda saqlanadi.
+Savol yoki variant o'zgarganda signal kalitni o'chiradi, shuning uchun
+topshirishda savollar bazadan o'qilmaydi.
+
+Javob harf ('A') yoki variant id'si bo'lishi mumkin: harf correct_option
+bilan, variant esa Option.is_correct bilan tekshiriladi. Harf variantga
+Option.order bo'yicha saralangan o'rni orqali bog'lanadi (order 0 dan
+boshlanishi yoki ketma-ket bo'lishi shart emas).
+
+Topshirish so'rovi faqat 'pending' holatidagi TestResult yaratadi; ball,
+savollar bo'yicha tahlil, izoh, faoliyat va xabarnoma grade_result() da
+Celery orqali bajariladi.
+"""
+from collections import Counter
+from django.core.cache import cache
+from django.db import transaction
+from apps.accounts.models import UserActivity
+from apps.notifications.tasks import send_test_notification
+from .feedback import get_feedback_generator
+from .models import Question, Option, TestResult, UserAnswer
+
+ANSWER_KEY_TIMEOUT = 60 * 60 * 24
+LETTERS = 'ABCD'
+
+
+def answer_key_cache_key(test_id):
+    return f'tests:answer_key:{test_id}'
+
+
+def get_answer_key(test_id):
+    """
+    {'answers': {question_id: 'A'}, 'count': n, 'ids': [question_id, ...],
+     'options': {question_id: [option_id, ...]}, 'correct_options': {question_id: [option_id, ...]},
+     'by_difficulty': {'easy': [question_id, ...]}}
+    """
+    key = answer_key_cache_key(test_id)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answers = {}
+        by_difficulty = {}
+        rows = Question.objects.filter(test_id=test_id).order_by('created_at', 'id').values_list(
+            'id', 'correct_option', 'difficulty'
+        )
+        for question_id, correct_option, difficulty in rows:
+            answers[str(question_id)] = correct_option
+            by_difficulty.setdefault(difficulty, []).append(str(question_id))
+        options = {}
+        correct_options = {}
+        option_rows = Option.objects.filter(question__test_id=test_id).order_by(
+            'question_id', 'order', 'id'
+        ).values_list('question_id', 'id', 'is_correct')
+        for question_id, option_id, is_correct in option_rows:
+            options.setdefault(str(question_id), []).append(option_id)
+            if is_correct:
+                correct_options.setdefault(str(question_id), []).append(option_id)
+        answer_key = {
+            'answers': answers,
+            'count': len(answers),
+            'ids': list(answers),
+            'options': options,
+            'correct_options': correct_options,
+            'by_difficulty': by_difficulty,
+        }
+        cache.set(key, answer_key, ANSWER_KEY_TIMEOUT)
+    return answer_key
+
+
+def is_correct_answer(answer_key, question_id, answer):
+    """Harf correct_option bilan, variant id'si Option.is_correct bilan solishtiriladi"""
+    if isinstance(answer, str):
+        return answer == answer_key['answers'].get(question_id)
+    return answer in answer_key['correct_options'].get(question_id, ())
+
+
+def answer_option_id(answer_key, question_id, answer):
+    """Javobga mos variant id'si (harf - variantning order bo'yicha o'rni)"""
+    options = answer_key['options'].get(question_id, [])
+    if isinstance(answer, str):
+        position = LETTERS.find(answer) if len(answer) == 1 else -1
+        return options[position] if 0 <= position < len(options) else None
+    return answer if answer in options else None
+
+
+def invalidate_answer_key(test_id):
+    # Tranzaksiya tugagach o'chiramiz, aks holda parallel so'rov eski kalitni qayta yozib qo'yishi mumkin
+    transaction.on_commit(lambda: cache.delete(answer_key_cache_key(test_id)))
+
+
+def grade(answer_key, answers, question_ids=None):
+    """
+    answers: {question_id: 'A' yoki option_id} -> (to'g'ri javoblar, jami savollar, foiz).
+    question_ids berilsa faqat shu savollar (bankdan tanlangan to'plam) baholanadi.
+    """
+    key = answer_key['answers']
+    if question_ids:
+        key = {question_id: key[question_id] for question_id in question_ids if question_id in key}
+    correct = sum(
+        1 for question_id in key
+        if is_correct_answer(answer_key, question_id, answers.get(question_id))
+    )
+    total = len(key)
+    score = int((correct / total) * 100) if total else 0
+    return correct, total, score
+
+
+def grade_result(result_id):
+    """Kutilayotgan natijani baholash (takroriy chaqiruv xavfsiz)"""
+    with transaction.atomic():
+        result = TestResult.objects.select_for_update().select_related('test').get(pk=result_id)
+        if result.status != 'pending':
+            return result
+
+        answer_key = get_answer_key(result.test_id)
+        correct, total, result.score = grade(answer_key, result.submitted_answers, result.question_ids)
+
+        # Savollar bo'yicha tahlil: variantlar keshdagi kalitdan, yo'q bo'lib ketganlari tashlanadi
+        key = answer_key['answers']
+        allowed = set(result.question_ids) if result.question_ids else key
+        selected = {}
+        for question_id, answer in result.submitted_answers.items():
+            if question_id in allowed and question_id in key:
+                option_id = answer_option_id(answer_key, question_id, answer)
+                if option_id is not None:
+                    selected[question_id] = (option_id, is_correct_answer(answer_key, question_id, answer))
+        existing = set(Option.objects.filter(
+            id__in=[option_id for option_id, _ in selected.values()]
+        ).values_list('id', flat=True))
+        UserAnswer.objects.bulk_create([
+            UserAnswer(
+                result=result,
+                question_id=question_id,
+                selected_option_id=option_id,
+                is_correct=is_correct
+            )
+            for question_id, (option_id, is_correct) in selected.items()
+            if option_id in existing
+        ], ignore_conflicts=True)
+
+        difficulty_of = {
+            question_id: difficulty
+            for difficulty, question_ids in answer_key['by_difficulty'].items()
+            for question_id in question_ids
+        }
+        missed = Counter(
+            difficulty_of[question_id] for question_id in allowed
+            if question_id in key and not is_correct_answer(
+                answer_key, question_id, result.submitted_answers.get(question_id)
+            )
+        )
+        result.feedback = get_feedback_generator()(result, correct, total, dict(missed))
+        result.status = 'graded'
+        result.save(update_fields=['score', 'feedback', 'status'])
+
+        UserActivity.objects.create(
+            user_id=result.user_id,
+            activity_type='test',
+            title=f'Test topshirildi: {result.test.title}',
+            description=f'Siz {result.test.title} testini {result.score}% natija bilan topshirdingiz'
+        )
+        transaction.on_commit(
+            lambda: send_test_notification.delay(str(result.user_id), str(result.test_id))
+        )
+    return result
@@ -0,0 +1,128 @@
+"""
+Savollarni ommaviy import qilish.
+
+CSV yoki JSON-lines fayl satrma-satr o'qiladi, har bir satr tekshiriladi va
+savollar variantlari bilan birga bulk_create bo'laklarida yoziladi. Fayl
+to'liq xotiraga yuklanmaydi, xatolar ro'yxati ham cheklangan.
+
+Ustunlar: text, option_a, option_b, option_c, option_d, correct_option, difficulty (ixtiyoriy)
+"""
+import csv
+import io
+import json
+from django.db import transaction
+from rest_framework import serializers
+from core.cache import bump_namespace
+from .grading import invalidate_answer_key
+from .models import Question, Option
+
+FORMATS = ('csv', 'jsonl')
+OPTION_FIELDS = ('option_a', 'option_b', 'option_c', 'option_d')
+
+
+class QuestionImportRowSerializer(serializers.Serializer):
+    text = serializers.CharField()
+    option_a = serializers.CharField(max_length=255)
+    option_b = serializers.CharField(max_length=255)
+    option_c = serializers.CharField(max_length=255)
+    option_d = serializers.CharField(max_length=255)
+    correct_option = serializers.ChoiceField(choices=['A', 'B', 'C', 'D'])
+    difficulty = serializers.ChoiceField(
+        choices=[choice for choice, _ in Question.DIFFICULTY_CHOICES],
+        default='medium'
+    )
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get('correct_option'), str):
+            data = {**data, 'correct_option': data['correct_option'].strip().upper()}
+        if isinstance(data, dict) and not data.get('difficulty'):
+            data = {key: value for key, value in data.items() if key != 'difficulty'}
+        return super().to_internal_value(data)
+
+
+def detect_format(filename):
+    if filename.lower().endswith('.csv'):
+        return 'csv'
+    if filename.lower().endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return None
+
+
+def iter_rows(stream, fmt):
+    """(satr raqami, ma'lumot yoki None, xato) ketma-ketligi"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"JSON noto'g'ri: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Satr obyekt bo'lishi kerak"
+            continue
+        yield line_number, row, None
+
+
+def _flush(questions, options):
+    with transaction.atomic():
+        Question.objects.bulk_create(questions)
+        Option.objects.bulk_create(options)
+    questions.clear()
+    options.clear()
+
+
+def import_questions(test, stream, fmt, chunk_size=500, max_errors=100):
+    """
+    Savollarni oqim bilan import qilish.
+    Qaytaradi: {'created': n, 'error_count': m, 'errors': [{'line': 3, 'errors': {...}}]}
+    """
+    created = 0
+    error_count = 0
+    errors = []
+    questions = []
+    options = []
+
+    for line_number, row, error in iter_rows(stream, fmt):
+        if error is None:
+            serializer = QuestionImportRowSerializer(data=row)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                question = Question(test=test, **data)
+                questions.append(question)
+                # Variantlar savol pk'si bilan darhol bog'lanadi (UUID obyekt yaratilganda beriladi)
+                options.extend(
+                    Option(
+                        question=question,
+                        text=data[field],
+                        is_correct=data['correct_option'] == letter,
+                        order=order
+                    )
+                    for order, (letter, field) in enumerate(zip('ABCD', OPTION_FIELDS))
+                )
+                if len(questions) >= chunk_size:
+                    created += len(questions)
+                    _flush(questions, options)
+                continue
+            error = serializer.errors
+
+        error_count += 1
+        if len(errors) < max_errors:
+            errors.append({'line': line_number, 'errors': error})
+
+    if questions:
+        created += len(questions)
+        _flush(questions, options)
+
+    # bulk_create signallarni chaqirmaydi
+    if created:
+        invalidate_answer_key(test.pk)
+        bump_namespace('tests')
+
+    return {'created': created, 'error_count': error_count, 'errors': errors}
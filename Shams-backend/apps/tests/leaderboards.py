@@ -0,0 +1,87 @@
+"""
+Test reytinglari.
+
+Har bir test uchun foydalanuvchining eng yaxshi balli va umumiy reyting
+(testlar bo'yicha eng yaxshi ballar yig'indisi) tezkor ombordagi sorted
+set'larda saqlanadi. TestResult yaratilganda yangilanadi; top-K va
+foydalanuvchi o'rni O(log n) da olinadi.
+"""
+import uuid
+from collections import defaultdict
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from core.kv import get_store
+from .models import Test, TestResult
+
+GLOBAL_KEY = 'tests:leaderboard:global'
+
+
+def test_key(test_id):
+    return f'tests:leaderboard:{test_id}'
+
+
+def record_result(user_id, test_id, score):
+    """Natijani reytinglarga yozish (faqat eng yaxshi ball hisobga olinadi)"""
+    # Taqqoslash, yangilash va umumiy reytingga farqni qo'shish atomar bajariladi
+    return get_store().zadd_best(test_key(test_id), GLOBAL_KEY, str(user_id), score)
+
+
+def get_standing(key, user_id):
+    store = get_store()
+    rank = store.zrevrank(key, str(user_id))
+    if rank is None:
+        return None
+    total = store.zcard(key)
+    return {
+        'rank': rank + 1,
+        'score': int(store.zscore(key, str(user_id))),
+        'percentile': round(100 * (total - rank) / total, 1),
+        'total': total,
+    }
+
+
+def get_leaderboard(key, user, limit=10):
+    """Top-K va so'rovchining o'rni"""
+    top = [(uuid.UUID(member), score) for member, score in get_store().zrevrange(key, 0, limit - 1)]
+    users = get_user_model().objects.only('id', 'username', 'full_name').in_bulk(
+        [user_id for user_id, _ in top]
+    )
+    entries = []
+    for position, (user_id, score) in enumerate(top, start=1):
+        entry_user = users.get(user_id)
+        entries.append({
+            'rank': position,
+            'user_id': str(user_id),
+            'full_name': (entry_user.full_name or entry_user.username) if entry_user else '',
+            'score': int(score),
+        })
+    return {
+        'top': entries,
+        'me': get_standing(key, user.pk) if user.is_authenticated else None,
+    }
+
+
+def rebuild_leaderboards(batch_size=1000):
+    """Reytinglarni TestResult'dan qayta qurish"""
+    store = get_store()
+    store.delete(GLOBAL_KEY)
+    for test_id in Test.objects.values_list('id', flat=True).iterator():
+        store.delete(test_key(test_id))
+
+    totals = defaultdict(int)
+    batches = defaultdict(dict)
+    rows = TestResult.objects.filter(status='graded').values('test_id', 'user_id').annotate(best=Max('score')).order_by()
+    for row in rows.iterator():
+        user_id = str(row['user_id'])
+        totals[user_id] += row['best']
+        batch = batches[row['test_id']]
+        batch[user_id] = row['best']
+        if len(batch) >= batch_size:
+            store.zadd(test_key(row['test_id']), batches.pop(row['test_id']))
+    for test_id, batch in batches.items():
+        store.zadd(test_key(test_id), batch)
+
+    members = list(totals.items())
+    for start in range(0, len(members), batch_size):
+        store.zadd(GLOBAL_KEY, dict(members[start:start + batch_size]))
+    return len(totals)
@@ -0,0 +1,33 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from apps.tests.importer import FORMATS, detect_format, import_questions
+from apps.tests.models import Test
+
+
+class Command(BaseCommand):
+    help = "CSV yoki JSON-lines fayldan testga savollarni import qilish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_id')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            test = Test.objects.get(pk=options['test_id'])
+        except (Test.DoesNotExist, ValidationError):
+            raise CommandError('Test topilmadi')
+
+        fmt = options['format'] or detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Fayl formatini --format bilan ko'rsating")
+
+        with open(options['path'], 'rb') as stream:
+            report = import_questions(test, stream, fmt, chunk_size=options['chunk_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"{error['line']}-satr: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} ta savol qo'shildi, {report['error_count']} ta xato"
+        ))
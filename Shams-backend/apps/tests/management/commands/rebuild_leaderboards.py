@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.tests.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Test reytinglarini TestResult'dan qayta qurish"
+
+    def handle(self, *args, **options):
+        count = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(f'{count} ta foydalanuvchi reytingga yozildi'))
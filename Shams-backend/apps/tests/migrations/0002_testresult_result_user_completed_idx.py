@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['user', '-completed_at', '-id'], name='result_user_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:13
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0002_testresult_result_user_completed_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestAttempt',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('in_progress', 'Jarayonda'), ('submitted', 'Topshirilgan'), ('expired', 'Vaqti tugagan')], default='in_progress', max_length=20, verbose_name='status')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('deadline', models.DateTimeField(verbose_name='deadline')),
+                ('submitted_at', models.DateTimeField(blank=True, null=True, verbose_name='submitted at')),
+                ('result', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attempt', to='tests.testresult')),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='tests.test')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'test attempt',
+                'verbose_name_plural': 'test attempts',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['status', 'deadline'], name='attempt_status_deadline_idx'), models.Index(fields=['user', 'test', 'status'], name='attempt_user_test_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0003_testattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='difficulty',
+            field=models.CharField(choices=[('easy', 'Oson'), ('medium', "O'rtacha"), ('hard', 'Qiyin')], default='medium', max_length=10, verbose_name='difficulty'),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='sample_size',
+            field=models.PositiveIntegerField(blank=True, help_text="Savollar bankidan har bir talabaga beriladigan savollar soni (bo'sh - hammasi)", null=True, verbose_name='sample size'),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='sample_strata',
+            field=models.JSONField(blank=True, default=dict, help_text='Qiyinlik bo\'yicha savollar soni, masalan {"easy": 5, "hard": 2}', verbose_name='sample strata'),
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list, help_text="Savollar bankidan tanlangan savollar (bo'sh - testning barcha savollari)", verbose_name='question ids'),
+        ),
+    ]
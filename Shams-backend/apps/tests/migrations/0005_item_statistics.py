@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0004_question_bank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.PositiveIntegerField(default=0, verbose_name='responses')),
+                ('difficulty', models.FloatField(blank=True, help_text="To'g'ri javoblar ulushi", null=True, verbose_name='difficulty')),
+                ('discrimination', models.FloatField(blank=True, help_text='Point-biserial korrelyatsiya (qolgan ball bilan)', null=True, verbose_name='discrimination')),
+                ('distractors', models.JSONField(blank=True, default=dict, help_text='{option_id: ulush}', verbose_name='distractors')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistic', to='tests.question')),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_statistics', to='tests.test')),
+            ],
+            options={
+                'verbose_name': 'question statistic',
+                'verbose_name_plural': 'question statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='TestStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('results_count', models.PositiveIntegerField(default=0, verbose_name='results count')),
+                ('mean_score', models.FloatField(blank=True, null=True, verbose_name='mean score')),
+                ('cronbach_alpha', models.FloatField(blank=True, null=True, verbose_name='Cronbach alpha')),
+                ('last_result_at', models.DateTimeField(blank=True, null=True, verbose_name='last result at')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistic', to='tests.test')),
+            ],
+            options={
+                'verbose_name': 'test statistic',
+                'verbose_name_plural': 'test statistics',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_score_buckets(apps, schema_editor):
+    TestResult = apps.get_model('tests', 'TestResult')
+    ScoreBucket = apps.get_model('tests', 'ScoreBucket')
+    rows = TestResult.objects.values('test_id', 'score').annotate(count=Count('id')).order_by()
+    ScoreBucket.objects.bulk_create(
+        [ScoreBucket(test_id=row['test_id'], score=min(row['score'], 100), count=row['count']) for row in rows],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0005_item_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='score')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='count')),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='tests.test')),
+            ],
+            options={
+                'verbose_name': 'score bucket',
+                'verbose_name_plural': 'score buckets',
+                'unique_together': {('test', 'score')},
+            },
+        ),
+        migrations.RunPython(fill_score_buckets, migrations.RunPython.noop),
+    ]
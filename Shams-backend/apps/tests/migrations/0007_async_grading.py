@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0006_scorebucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testresult',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list, help_text="Baholanadigan savollar (bo'sh - testning barcha savollari)", verbose_name='question ids'),
+        ),
+        # Mavjud natijalar allaqachon baholangan
+        migrations.AddField(
+            model_name='testresult',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Baholanmoqda'), ('graded', 'Baholangan'), ('failed', 'Xatolik')], default='graded', max_length=10, verbose_name='status'),
+        ),
+        migrations.AlterField(
+            model_name='testresult',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Baholanmoqda'), ('graded', 'Baholangan'), ('failed', 'Xatolik')], default='pending', max_length=10, verbose_name='status'),
+        ),
+        migrations.AddField(
+            model_name='testresult',
+            name='submitted_answers',
+            field=models.JSONField(blank=True, default=dict, help_text='Baholash uchun yuborilgan javoblar {question_id: "A"}', verbose_name='submitted answers'),
+        ),
+        migrations.AlterField(
+            model_name='testresult',
+            name='score',
+            field=models.PositiveIntegerField(default=0, help_text='Score in percentage', verbose_name='score'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0007_async_grading'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testresult',
+            name='submitted_answers',
+            field=models.JSONField(blank=True, default=dict, help_text='Baholash uchun yuborilgan javoblar {question_id: "A" yoki option_id}', verbose_name='submitted answers'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def expire_duplicate_attempts(apps, schema_editor):
+    # Eski kod muddati o'tgan urinish turganda yangisini ochardi: eng oxirgisidan boshqasi yopiladi
+    TestAttempt = apps.get_model('tests', 'TestAttempt')
+    seen = set()
+    for attempt in TestAttempt.objects.filter(status='in_progress').order_by('-started_at').iterator():
+        key = (attempt.user_id, attempt.test_id)
+        if key in seen:
+            TestAttempt.objects.filter(pk=attempt.pk).update(status='expired')
+        seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0008_submitted_answers_option_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(expire_duplicate_attempts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='testattempt',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'in_progress')), fields=('user', 'test'), name='attempt_one_in_progress'),
+        ),
+    ]
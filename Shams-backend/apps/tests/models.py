@@ -25,6 +25,18 @@ class Test(models.Model):
         related_name='created_tests'
     )
     is_active = models.BooleanField(_('is active'), default=True)
+    sample_size = models.PositiveIntegerField(
+        _('sample size'),
+        null=True,
+        blank=True,
+        help_text='Savollar bankidan har bir talabaga beriladigan savollar soni (bo\'sh - hammasi)'
+    )
+    sample_strata = models.JSONField(
+        _('sample strata'),
+        default=dict,
+        blank=True,
+        help_text='Qiyinlik bo\'yicha savollar soni, masalan {"easy": 5, "hard": 2}'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -38,6 +50,12 @@ class Test(models.Model):
 
 class Question(models.Model):
     """Test savoli"""
+    DIFFICULTY_CHOICES = [
+        ('easy', 'Oson'),
+        ('medium', "O'rtacha"),
+        ('hard', 'Qiyin'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='questions')
     text = models.TextField(_('text'))
@@ -55,6 +73,7 @@ class Question(models.Model):
             ('D', 'D')
         ]
     )
+    difficulty = models.CharField(_('difficulty'), max_length=10, choices=DIFFICULTY_CHOICES, default='medium')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -86,6 +105,12 @@ class Option(models.Model):
 
 class TestResult(models.Model):
     """Test natijasi"""
+    STATUS_CHOICES = [
+        ('pending', 'Baholanmoqda'),
+        ('graded', 'Baholangan'),
+        ('failed', 'Xatolik'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -93,7 +118,20 @@ class TestResult(models.Model):
         related_name='test_results'
     )
     test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='results')
-    score = models.PositiveIntegerField(_('score'), help_text='Score in percentage')
+    score = models.PositiveIntegerField(_('score'), help_text='Score in percentage', default=0)
+    status = models.CharField(_('status'), max_length=10, choices=STATUS_CHOICES, default='pending')
+    submitted_answers = models.JSONField(
+        _('submitted answers'),
+        default=dict,
+        blank=True,
+        help_text='Baholash uchun yuborilgan javoblar {question_id: "A" yoki option_id}'
+    )
+    question_ids = models.JSONField(
+        _('question ids'),
+        default=list,
+        blank=True,
+        help_text='Baholanadigan savollar (bo\'sh - testning barcha savollari)'
+    )
     completed_at = models.DateTimeField(auto_now_add=True)
     feedback = models.TextField(_('feedback'), blank=True)
 
@@ -101,6 +139,9 @@ class TestResult(models.Model):
         verbose_name = _('test result')
         verbose_name_plural = _('test results')
         ordering = ['-completed_at']
+        indexes = [
+            models.Index(fields=['user', '-completed_at', '-id'], name='result_user_completed_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.email} - {self.test.title} - {self.score}%'
@@ -120,3 +161,108 @@ class UserAnswer(models.Model):
 
     def __str__(self):
         return f'{self.result.user.username} - {self.question.text[:50]}'
+
+class TestAttempt(models.Model):
+    """Test urinishi (server tomonidagi sessiya)"""
+    STATUS_CHOICES = [
+        ('in_progress', 'Jarayonda'),
+        ('submitted', 'Topshirilgan'),
+        ('expired', 'Vaqti tugagan'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='test_attempts'
+    )
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='attempts')
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='in_progress')
+    started_at = models.DateTimeField(auto_now_add=True)
+    deadline = models.DateTimeField(_('deadline'))
+    submitted_at = models.DateTimeField(_('submitted at'), null=True, blank=True)
+    question_ids = models.JSONField(
+        _('question ids'),
+        default=list,
+        blank=True,
+        help_text='Savollar bankidan tanlangan savollar (bo\'sh - testning barcha savollari)'
+    )
+    result = models.OneToOneField(
+        TestResult,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attempt'
+    )
+
+    class Meta:
+        verbose_name = _('test attempt')
+        verbose_name_plural = _('test attempts')
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['status', 'deadline'], name='attempt_status_deadline_idx'),
+            models.Index(fields=['user', 'test', 'status'], name='attempt_user_test_status_idx'),
+        ]
+        constraints = [
+            # Foydalanuvchida bir testda bittadan ortiq faol urinish bo'lmaydi
+            models.UniqueConstraint(
+                fields=['user', 'test'],
+                condition=models.Q(status='in_progress'),
+                name='attempt_one_in_progress'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user.email} - {self.test.title} - {self.status}'
+
+class TestStatistic(models.Model):
+    """Test statistikasi (item analysis)"""
+    test = models.OneToOneField(Test, on_delete=models.CASCADE, related_name='statistic')
+    results_count = models.PositiveIntegerField(_('results count'), default=0)
+    mean_score = models.FloatField(_('mean score'), null=True, blank=True)
+    cronbach_alpha = models.FloatField(_('Cronbach alpha'), null=True, blank=True)
+    last_result_at = models.DateTimeField(_('last result at'), null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('test statistic')
+        verbose_name_plural = _('test statistics')
+
+    def __str__(self):
+        return f'{self.test.title} - {self.results_count}'
+
+class QuestionStatistic(models.Model):
+    """Savol statistikasi: qiyinlik, ajrata olish va distraktorlar"""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='statistic')
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='question_statistics')
+    responses = models.PositiveIntegerField(_('responses'), default=0)
+    difficulty = models.FloatField(_('difficulty'), null=True, blank=True, help_text="To'g'ri javoblar ulushi")
+    discrimination = models.FloatField(
+        _('discrimination'),
+        null=True,
+        blank=True,
+        help_text='Point-biserial korrelyatsiya (qolgan ball bilan)'
+    )
+    distractors = models.JSONField(_('distractors'), default=dict, blank=True, help_text='{option_id: ulush}')
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('question statistic')
+        verbose_name_plural = _('question statistics')
+
+    def __str__(self):
+        return f'{self.question.text[:50]} - {self.difficulty}'
+
+class ScoreBucket(models.Model):
+    """Test ballari taqsimoti: har bir ball (0-100) uchun natijalar soni"""
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='score_buckets')
+    score = models.PositiveSmallIntegerField(_('score'))
+    count = models.PositiveIntegerField(_('count'), default=0)
+
+    class Meta:
+        verbose_name = _('score bucket')
+        verbose_name_plural = _('score buckets')
+        unique_together = ['test', 'score']
+
+    def __str__(self):
+        return f'{self.test_id} - {self.score}% - {self.count}'
@@ -1,6 +1,10 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Test, Question, Option, TestResult, UserAnswer
-from apps.courses.serializers import CategorySerializer
+from .models import (
+    Test, Question, Option, TestResult, UserAnswer, TestAttempt, TestStatistic, QuestionStatistic
+)
+from .attempts import get_buffered_answers, ordered_questions
+from .distribution import get_distribution, get_percentile
 
 class OptionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,7 +26,8 @@ class QuestionSerializer(serializers.ModelSerializer):
             'option_a',
             'option_b',
             'option_c',
-            'option_d'
+            'option_d',
+            'options'
         ]
 
 class QuestionWithAnswerSerializer(QuestionSerializer):
@@ -30,9 +35,9 @@ class QuestionWithAnswerSerializer(QuestionSerializer):
         fields = QuestionSerializer.Meta.fields + ['correct_option']
 
 class TestSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True)
+    # Test.category - choices'li CharField, Category modeliga bog'lanmagan
+    category = serializers.CharField(read_only=True)
     questions_count = serializers.SerializerMethodField()
-    has_result = serializers.SerializerMethodField()
     
     class Meta:
         model = Test
@@ -47,19 +52,27 @@ class TestSerializer(serializers.ModelSerializer):
         ]
     
     def get_questions_count(self, obj):
-        return obj.questions.count()
-    
-    def get_has_result(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.results.filter(user=request.user).exists()
-        return False
+        # Bank rejimida talabaga beriladigan savollar soni
+        if obj.sample_strata:
+            return sum(obj.sample_strata.values())
+        # Ro'yxatlarda savollar soni so'rovning o'zida annotatsiya qilinadi
+        count = obj.questions_total if hasattr(obj, 'questions_total') else obj.questions.count()
+        if obj.sample_size:
+            return min(obj.sample_size, count)
+        return count
 
 class TestDetailSerializer(TestSerializer):
-    questions = QuestionSerializer(many=True, read_only=True)
+    questions = serializers.SerializerMethodField()
     
     class Meta(TestSerializer.Meta):
         fields = TestSerializer.Meta.fields + ['questions']
+    
+    def get_questions(self, obj):
+        questions = obj.questions.all()
+        seed = self.context.get('question_seed')
+        if seed is not None:
+            questions = ordered_questions(questions, seed)
+        return QuestionSerializer(questions, many=True, context=self.context).data
 
 class UserAnswerSerializer(serializers.ModelSerializer):
     question = QuestionSerializer(read_only=True)
@@ -77,16 +90,48 @@ class UserAnswerSerializer(serializers.ModelSerializer):
 class TestResultSerializer(serializers.ModelSerializer):
     test = TestSerializer(read_only=True)
     answers = UserAnswerSerializer(many=True, read_only=True)
+    percentile = serializers.SerializerMethodField()
+    mean_score = serializers.SerializerMethodField()
+    median_score = serializers.SerializerMethodField()
     
     class Meta:
         model = TestResult
         fields = [
             'id',
             'test',
+            'status',
             'score',
+            'percentile',
+            'mean_score',
+            'median_score',
             'completed_at',
-            'feedback'
+            'feedback',
+            'answers'
         ]
+    
+    def _distribution(self, obj):
+        # Ro'yxatda bir test uchun gistogramma bir marta olinadi
+        distributions = self.context.setdefault('score_distributions', {})
+        if obj.test_id not in distributions:
+            distributions[obj.test_id] = get_distribution(obj.test_id)
+        return distributions[obj.test_id]
+    
+    def get_percentile(self, obj):
+        if obj.status != 'graded':
+            return None
+        return get_percentile(self._distribution(obj), obj.score)
+    
+    def get_mean_score(self, obj):
+        return self._distribution(obj)['mean']
+    
+    def get_median_score(self, obj):
+        return self._distribution(obj)['median']
+
+class TestResultListSerializer(TestResultSerializer):
+    """Natijalar ro'yxati uchun: javoblar tahlilisiz"""
+    
+    class Meta(TestResultSerializer.Meta):
+        fields = [field for field in TestResultSerializer.Meta.fields if field != 'answers']
 
 class TestSubmitSerializer(serializers.Serializer):
     answers = serializers.DictField(
@@ -94,6 +139,76 @@ class TestSubmitSerializer(serializers.Serializer):
         help_text='Dictionary of question_id: answer'
     )
 
+class OptionAnswerSerializer(serializers.Serializer):
+    question_id = serializers.UUIDField()
+    option_id = serializers.IntegerField()
+
+class TestOptionSubmitSerializer(serializers.Serializer):
+    """Javoblar variant id'lari bilan: [{"question_id": ..., "option_id": ...}]"""
+    answers = serializers.ListField(child=OptionAnswerSerializer(), allow_empty=False)
+
+class TestAttemptSerializer(serializers.ModelSerializer):
+    answers = serializers.SerializerMethodField()
+    remaining_seconds = serializers.SerializerMethodField()
+    score = serializers.IntegerField(source='result.score', read_only=True, default=None)
+    result_status = serializers.CharField(source='result.status', read_only=True, default=None)
+    
+    class Meta:
+        model = TestAttempt
+        fields = [
+            'id',
+            'test',
+            'status',
+            'started_at',
+            'deadline',
+            'submitted_at',
+            'remaining_seconds',
+            'answers',
+            'result',
+            'result_status',
+            'score'
+        ]
+    
+    def get_answers(self, obj):
+        if obj.status != 'in_progress':
+            return {}
+        return get_buffered_answers(obj)
+    
+    def get_remaining_seconds(self, obj):
+        if obj.status != 'in_progress':
+            return 0
+        return max(int((obj.deadline - timezone.now()).total_seconds()), 0)
+
+class QuestionStatisticSerializer(serializers.ModelSerializer):
+    question_text = serializers.CharField(source='question.text', read_only=True)
+    
+    class Meta:
+        model = QuestionStatistic
+        fields = [
+            'question',
+            'question_text',
+            'responses',
+            'difficulty',
+            'discrimination',
+            'distractors',
+            'computed_at'
+        ]
+
+class TestStatisticSerializer(serializers.ModelSerializer):
+    questions = QuestionStatisticSerializer(source='test.question_statistics', many=True, read_only=True)
+    
+    class Meta:
+        model = TestStatistic
+        fields = [
+            'test',
+            'results_count',
+            'mean_score',
+            'cronbach_alpha',
+            'last_result_at',
+            'computed_at',
+            'questions'
+        ]
+
 class TestCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Test
@@ -101,9 +216,22 @@ class TestCreateSerializer(serializers.ModelSerializer):
             'title',
             'category',
             'description',
-            'time_limit'
+            'time_limit',
+            'sample_size',
+            'sample_strata'
         ]
     
+    def validate_sample_strata(self, value):
+        difficulties = {choice for choice, _ in Question.DIFFICULTY_CHOICES}
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Qiyinlik: soni ko'rinishida bo'lishi kerak")
+        for difficulty, size in value.items():
+            if difficulty not in difficulties:
+                raise serializers.ValidationError(f"Noma'lum qiyinlik: {difficulty}")
+            if not isinstance(size, int) or size < 1:
+                raise serializers.ValidationError(f"{difficulty} uchun soni musbat butun son bo'lishi kerak")
+        return value
+    
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
         return super().create(validated_data)
@@ -118,5 +246,6 @@ class QuestionCreateSerializer(serializers.ModelSerializer):
             'option_b',
             'option_c',
             'option_d',
-            'correct_option'
+            'correct_option',
+            'difficulty'
         ] 
\ No newline at end of file
@@ -0,0 +1,56 @@
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from core.cache import bump_namespace
+from .models import Test, Question, Option, TestResult
+from .grading import invalidate_answer_key
+from .leaderboards import record_result
+from .distribution import add_score
+from .tasks import grade_test_result
+
+@receiver(post_save, sender=Test)
+@receiver(post_delete, sender=Test)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def invalidate_test_cache(sender, instance, **kwargs):
+    bump_namespace('tests')
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_answer_key(sender, instance, **kwargs):
+    invalidate_answer_key(instance.test_id)
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def invalidate_option_answer_key(sender, instance, **kwargs):
+    """Kalitda variantlar tartibi va is_correct ham saqlanadi"""
+    test_id = Question.objects.filter(pk=instance.question_id).values_list('test_id', flat=True).first()
+    if test_id is not None:
+        invalidate_answer_key(test_id)
+
+def _became_graded(instance, created, update_fields):
+    return instance.status == 'graded' and (created or (update_fields and 'status' in update_fields))
+
+@receiver(post_save, sender=TestResult)
+def enqueue_grading(sender, instance, created, **kwargs):
+    """Topshirilgan natijani tranzaksiyadan keyin baholashga yuborish"""
+    if created and instance.status == 'pending':
+        transaction.on_commit(lambda: grade_test_result.delay(str(instance.pk)))
+
+@receiver(post_save, sender=TestResult)
+def update_leaderboards(sender, instance, created, update_fields=None, **kwargs):
+    """Baholangan natijani reytinglarga yozish"""
+    if _became_graded(instance, created, update_fields):
+        transaction.on_commit(lambda: record_result(instance.user_id, instance.test_id, instance.score))
+
+@receiver(post_save, sender=TestResult)
+def add_result_to_distribution(sender, instance, created, update_fields=None, **kwargs):
+    if _became_graded(instance, created, update_fields):
+        add_score(instance.test_id, instance.score)
+
+@receiver(post_delete, sender=TestResult)
+def remove_result_from_distribution(sender, instance, **kwargs):
+    if instance.status == 'graded':
+        add_score(instance.test_id, instance.score, amount=-1)
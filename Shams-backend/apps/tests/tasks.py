@@ -0,0 +1,26 @@
+from celery import shared_task
+from .attempts import finalize_expired_attempts as _finalize_expired_attempts
+from .analytics import refresh_statistics
+from .grading import grade_result
+from .models import TestResult
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=10)
+def grade_test_result(self, result_id):
+    """Test natijasini baholash, izoh yozish va xabarnoma yuborish"""
+    try:
+        return grade_result(result_id).status
+    except Exception as exc:
+        if self.request.retries >= self.max_retries:
+            TestResult.objects.filter(pk=result_id, status='pending').update(status='failed')
+            raise
+        raise self.retry(exc=exc)
+
+@shared_task
+def finalize_expired_attempts():
+    """Muddati o'tgan test urinishlarini yakunlash"""
+    return _finalize_expired_attempts()
+
+@shared_task
+def refresh_item_statistics():
+    """Yangi natijalari bor testlar uchun savollar tahlilini yangilash"""
+    return refresh_statistics()
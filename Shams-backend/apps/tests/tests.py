@@ -1,3 +1,235 @@
+import uuid
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.accounts.models import User
+from core.celery import app as celery_app
+from .attempts import finalize_expired_attempts
+from .models import Test, Question, Option, TestResult, TestAttempt
 
-# Create your tests here.
+
+class TestsTestMixin:
+    def setUp(self):
+        cache.clear()
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', eager)
+
+        self.user = User.objects.create_user('student@example.com', 'secret', username='student', full_name='Student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_test(self, questions=4, **kwargs):
+        test = Test.objects.create(
+            title='Test', category='ai', description='Tavsif', time_limit=10, created_by=self.user, **kwargs
+        )
+        for index in range(questions):
+            question = Question.objects.create(
+                test=test, text=f'Savol {index}', option_a='a', option_b='b', option_c='c', option_d='d',
+                correct_option='A'
+            )
+            for order in range(4):
+                Option.objects.create(question=question, text='abcd'[order], is_correct=order == 0, order=order)
+        return test
+
+    def poll(self, result_id, attempts=5):
+        for _ in range(attempts):
+            response = self.client.get(f'/api/tests/results/{result_id}/')
+            self.assertEqual(response.status_code, 200)
+            if response.data['status'] == 'graded':
+                return response
+        self.fail('Natija baholanmadi')
+
+
+class AsyncGradingTests(TestsTestMixin, TestCase):
+    def test_submit_then_poll_until_graded(self):
+        test = self.create_test()
+        questions = list(test.questions.all())
+        answers = {str(questions[0].pk): 'A', str(questions[1].pk): 'A', str(questions[2].pk): 'B'}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/tests/{test.pk}/submit/', {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+
+        data = self.poll(response.data['id']).data
+        self.assertEqual(data['score'], 50)
+        self.assertEqual(data['test']['category'], 'ai')
+        self.assertEqual(len(data['answers']), 3)
+        self.assertEqual(sum(answer['is_correct'] for answer in data['answers']), 2)
+        self.assertTrue(data['feedback'])
+
+        listing = self.client.get('/api/tests/results/')
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual([row['id'] for row in listing.data['results']], [str(response.data['id'])])
+        self.assertNotIn('answers', listing.data['results'][0])
+
+    def test_pending_result_is_visible_before_grading(self):
+        test = self.create_test()
+        response = self.client.post(f'/api/tests/{test.pk}/submit/', {'answers': {}}, format='json')
+        self.assertEqual(response.status_code, 202)
+
+        data = self.client.get(f'/api/tests/results/{response.data["id"]}/').data
+        self.assertEqual(data['status'], 'pending')
+        self.assertIsNone(data['percentile'])
+        self.assertEqual(TestResult.objects.get().status, 'pending')
+
+
+class TestDetailTests(TestsTestMixin, TestCase):
+    def question_ids(self, response):
+        return [question['id'] for question in response.data['questions']]
+
+    def test_detail_query_count_and_stable_shuffle(self):
+        test = self.create_test(questions=8)
+
+        with self.assertNumQueries(3):
+            first = self.client.get(f'/api/tests/{test.pk}/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['questions_count'], 8)
+        self.assertEqual(len(first.data['questions'][0]['options']), 4)
+
+        second = self.client.get(f'/api/tests/{test.pk}/')
+        self.assertEqual(self.question_ids(first), self.question_ids(second))
+
+        other = User.objects.create_user('other@example.com', 'secret', username='other')
+        self.client.force_authenticate(other)
+        shuffled = self.question_ids(self.client.get(f'/api/tests/{test.pk}/'))
+        self.assertCountEqual(shuffled, self.question_ids(first))
+
+    def test_attempt_questions_and_unknown_attempts(self):
+        test = self.create_test(questions=10, sample_size=3)
+        attempt = self.client.post(f'/api/tests/{test.pk}/attempts/').data
+
+        response = self.client.get(f'/api/tests/{test.pk}/', {'attempt': attempt['id']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['questions']), 3)
+        again = self.client.get(f'/api/tests/{test.pk}/', {'attempt': attempt['id']})
+        self.assertEqual(self.question_ids(response), self.question_ids(again))
+
+        # O'ylab topilgan yoki begona urinish bilan bankni qayta tanlab bo'lmaydi
+        self.assertEqual(self.client.get(f'/api/tests/{test.pk}/', {'attempt': uuid.uuid4()}).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/tests/{test.pk}/', {'attempt': 'x'}).status_code, 404)
+        other = User.objects.create_user('other@example.com', 'secret', username='other')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(f'/api/tests/{test.pk}/', {'attempt': attempt['id']}).status_code, 404)
+
+
+class AttemptTests(TestsTestMixin, TestCase):
+    def test_start_autosave_and_finalize(self):
+        test = self.create_test()
+        questions = [str(question_id) for question_id in test.questions.values_list('id', flat=True)]
+
+        started = self.client.post(f'/api/tests/{test.pk}/attempts/')
+        self.assertEqual(started.status_code, 201)
+        reused = self.client.post(f'/api/tests/{test.pk}/attempts/')
+        self.assertEqual(reused.status_code, 200)
+        self.assertEqual(reused.data['id'], started.data['id'])
+
+        attempt_url = f'/api/tests/attempts/{started.data["id"]}/'
+        saved = self.client.patch(f'{attempt_url}answers/', {'answers': {questions[0]: 'A'}}, format='json')
+        self.assertEqual(saved.status_code, 200)
+        self.client.patch(f'{attempt_url}answers/', {'answers': {questions[1]: 'C'}}, format='json')
+        self.assertEqual(self.client.get(attempt_url).data['answers'], {questions[0]: 'A', questions[1]: 'C'})
+
+        unknown = self.client.patch(f'{attempt_url}answers/', {'answers': {str(uuid.uuid4()): 'A'}}, format='json')
+        self.assertEqual(unknown.status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            submitted = self.client.post(f'{attempt_url}submit/')
+        self.assertEqual(submitted.data['status'], 'submitted')
+        result = TestAttempt.objects.get(pk=started.data['id']).result
+        self.assertEqual(self.poll(result.pk).data['score'], 25)
+
+        closed = self.client.patch(f'{attempt_url}answers/', {'answers': {questions[2]: 'A'}}, format='json')
+        self.assertEqual(closed.status_code, 409)
+
+    def test_expired_attempt_is_finalized_before_a_new_one(self):
+        test = self.create_test()
+        started = self.client.post(f'/api/tests/{test.pk}/attempts/').data
+        TestAttempt.objects.filter(pk=started['id']).update(deadline=timezone.now() - timedelta(minutes=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/tests/{test.pk}/attempts/')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(response.data['id'], started['id'])
+
+        old = TestAttempt.objects.get(pk=started['id'])
+        self.assertEqual(old.status, 'expired')
+        self.assertIsNotNone(old.result_id)
+        self.assertEqual(TestAttempt.objects.filter(user=self.user, status='in_progress').count(), 1)
+
+        # Muddati o'tgan urinishlar tozalovchisi qo'shimcha natija yaratmaydi
+        self.assertEqual(finalize_expired_attempts(), 0)
+        self.assertEqual(TestResult.objects.count(), 1)
+
+    def test_only_one_attempt_in_progress(self):
+        test = self.create_test()
+        TestAttempt.objects.create(user=self.user, test=test, deadline=timezone.now() + timedelta(minutes=5))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TestAttempt.objects.create(user=self.user, test=test, deadline=timezone.now() + timedelta(minutes=5))
+
+
+class ConditionalGetTests(TestsTestMixin, TestCase):
+    def test_list_and_detail_answer_304(self):
+        test = self.create_test()
+        for url in ('/api/tests/', f'/api/tests/{test.pk}/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(cached.status_code, 304, url)
+
+        # Variant o'zgarsa tafsilot ham yangilanadi
+        etag = self.client.get(f'/api/tests/{test.pk}/')['ETag']
+        option = Option.objects.filter(question__test=test).first()
+        option.text = 'yangi'
+        option.save()
+        self.assertEqual(self.client.get(f'/api/tests/{test.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_etag_is_per_user(self):
+        test = self.create_test()
+        response = self.client.get(f'/api/tests/{test.pk}/')
+        self.assertIn('Authorization', response['Vary'])
+        other = User.objects.create_user('other@example.com', 'secret', username='other')
+        self.client.force_authenticate(other)
+        self.assertEqual(
+            self.client.get(f'/api/tests/{test.pk}/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200
+        )
+
+
+class SubmitValidationTests(TestsTestMixin, TestCase):
+    def submit(self, test, answers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'/api/tests/{test.pk}/submit/', {'answers': answers}, format='json')
+
+    def test_option_ids_are_validated_against_the_test(self):
+        test = self.create_test()
+        other = self.create_test()
+        question = test.questions.first()
+        correct = question.options.get(is_correct=True)
+        foreign_question = other.questions.first()
+
+        response = self.submit(test, [{'question_id': str(foreign_question.pk), 'option_id': correct.pk}])
+        self.assertEqual(response.status_code, 400)
+        response = self.submit(test, [{'question_id': str(question.pk), 'option_id': foreign_question.options.first().pk}])
+        self.assertEqual(response.status_code, 400)
+        duplicate = {'question_id': str(question.pk), 'option_id': correct.pk}
+        self.assertEqual(self.submit(test, [duplicate, duplicate]).status_code, 400)
+        self.assertEqual(self.submit(test, {str(foreign_question.pk): 'A'}).status_code, 400)
+        self.assertFalse(TestResult.objects.exists())
+
+        response = self.submit(test, [duplicate])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.poll(response.data['id']).data['score'], 25)
+
+    def test_submit_query_count_does_not_grow_with_answers(self):
+        test = self.create_test(questions=12)
+        answers = {str(question_id): 'A' for question_id in test.questions.values_list('id', flat=True)}
+        self.client.post(f'/api/tests/{test.pk}/submit/', {'answers': {}}, format='json')
+        # Testni olish, natijani yaratish (kalit keshda)
+        with self.assertNumQueries(2):
+            response = self.client.post(f'/api/tests/{test.pk}/submit/', {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, 202)
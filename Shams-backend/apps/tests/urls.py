@@ -4,7 +4,16 @@ from .views import (
     TestDetailView,
     TestSubmitView,
     QuestionCreateView,
-    TestResultListView
+    TestResultListView,
+    TestAttemptStartView,
+    TestAttemptDetailView,
+    TestAttemptAnswersView,
+    TestAttemptSubmitView,
+    LeaderboardView,
+    TestLeaderboardView,
+    TestStatisticView,
+    QuestionImportView,
+    TestResultDetailView
 )
 
 app_name = 'tests'
@@ -12,12 +21,25 @@ app_name = 'tests'
 urlpatterns = [
     # Test URLs
     path('', TestListView.as_view(), name='test-list'),
-    path('<int:pk>/', TestDetailView.as_view(), name='test-detail'),
-    path('<int:pk>/submit/', TestSubmitView.as_view(), name='test-submit'),
+    path('<uuid:pk>/', TestDetailView.as_view(), name='test-detail'),
+    path('<uuid:pk>/submit/', TestSubmitView.as_view(), name='test-submit'),
+    path('<uuid:pk>/attempts/', TestAttemptStartView.as_view(), name='attempt-start'),
+    path('<uuid:pk>/leaderboard/', TestLeaderboardView.as_view(), name='test-leaderboard'),
+    path('<uuid:pk>/statistics/', TestStatisticView.as_view(), name='test-statistics'),
+    
+    # Leaderboard URLs
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    
+    # Attempt URLs
+    path('attempts/<uuid:pk>/', TestAttemptDetailView.as_view(), name='attempt-detail'),
+    path('attempts/<uuid:pk>/answers/', TestAttemptAnswersView.as_view(), name='attempt-answers'),
+    path('attempts/<uuid:pk>/submit/', TestAttemptSubmitView.as_view(), name='attempt-submit'),
     
     # Question URLs
     path('questions/create/', QuestionCreateView.as_view(), name='question-create'),
+    path('<uuid:pk>/questions/import/', QuestionImportView.as_view(), name='question-import'),
     
     # Test Result URLs
     path('results/', TestResultListView.as_view(), name='result-list'),
+    path('results/<uuid:pk>/', TestResultDetailView.as_view(), name='result-detail'),
 ] 
\ No newline at end of file
@@ -3,20 +3,35 @@ from rest_framework import viewsets, status, generics, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.parsers import MultiPartParser
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
+from django.http import Http404
 from django.core.cache import cache
-from .models import Test, Question, Option, TestResult, UserAnswer
+from django.db.models import Count, Prefetch, prefetch_related_objects
+from django.utils import timezone
+from .models import Test, Question, Option, TestResult, UserAnswer, TestAttempt, TestStatistic, QuestionStatistic
 from .serializers import (
     TestSerializer,
     QuestionSerializer,
     TestResultSerializer,
+    TestResultListSerializer,
     TestDetailSerializer,
     TestSubmitSerializer,
+    TestOptionSubmitSerializer,
+    TestAttemptSerializer,
+    TestStatisticSerializer,
     TestCreateSerializer,
     QuestionCreateSerializer
 )
 from apps.accounts.models import UserActivity
-import random
+from core.cache import ConditionalGetMixin
+from .grading import get_answer_key
+from .importer import FORMATS, detect_format, import_questions
+from .leaderboards import GLOBAL_KEY, get_leaderboard, test_key
+from .attempts import AttemptClosed, start_attempt, save_answers, finalize_attempt, question_seed, sample_questions
+from core.pagination import CompletedAtCursorPagination
+import uuid
 
 class TestViewSet(viewsets.ReadOnlyModelViewSet):
     """Testlar"""
@@ -31,88 +46,25 @@ class TestViewSet(viewsets.ReadOnlyModelViewSet):
             queryset = queryset.filter(category__slug=category)
         return queryset
     
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
-    def submit(self, request, pk=None):
-        """Testni yakunlash"""
-        test = self.get_object()
-        
-        # Test natijasini tekshirish
-        if test.results.filter(user=request.user).exists():
-            return Response(
-                {'detail': 'Siz allaqachon bu testni topshirgansiz'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Javoblarni olish
-        answers = request.data.get('answers', [])
-        if not answers:
-            return Response(
-                {'detail': 'Javoblar kiritilmagan'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Test natijasini yaratish
-        result = TestResult.objects.create(
-            user=request.user,
-            test=test,
-            time_spent=request.data.get('time_spent', 0)
-        )
-        
-        # Javoblarni saqlash
-        correct_answers = 0
-        for answer in answers:
-            question = get_object_or_404(Question, id=answer['question_id'])
-            option = get_object_or_404(Option, id=answer['option_id'])
-            
-            # Javobni saqlash
-            UserAnswer.objects.create(
-                result=result,
-                question=question,
-                selected_option=option,
-                is_correct=option.is_correct
-            )
-            
-            if option.is_correct:
-                correct_answers += 1
-        
-        # Natijani hisoblash
-        total_questions = test.questions.count()
-        result.correct_answers = correct_answers
-        result.incorrect_answers = total_questions - correct_answers
-        result.score = int((correct_answers / total_questions) * 100)
-        result.is_completed = True
-        result.save()
-        
-        # Faoliyat yaratish
-        UserActivity.objects.create(
-            user=request.user,
-            activity_type='test',
-            title=f'Test topshirildi: {test.title}',
-            description=f'Siz {test.title} testini {result.score}% natija bilan topshirdingiz'
-        )
-        
-        return Response(
-            TestResultSerializer(result).data,
-            status=status.HTTP_201_CREATED
-        )
-    
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def results(self, request, pk=None):
         """Test natijasi"""
         test = self.get_object()
         
-        # Natijani olish
-        try:
-            result = test.results.get(user=request.user)
-            serializer = TestResultSerializer(result)
-            return Response(serializer.data)
-        except TestResult.DoesNotExist:
+        # Urinishlar bir nechta natija yaratadi: oxirgisini qaytaramiz
+        result = test.results.filter(user=request.user).select_related('test').prefetch_related(
+            'answers__question__options', 'answers__selected_option'
+        ).order_by('-completed_at').first()
+        if result is None:
             return Response(
                 {'detail': 'Test natijasi topilmadi'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        serializer = TestResultSerializer(result)
+        return Response(serializer.data)
 
-class TestListView(generics.ListCreateAPIView):
+class TestListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    cache_namespaces = ('tests',)
     queryset = Test.objects.all()
     serializer_class = TestSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -137,74 +89,253 @@ class TestListView(generics.ListCreateAPIView):
             return TestCreateSerializer
         return self.serializer_class
 
-class TestDetailView(generics.RetrieveAPIView):
+class TestDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    # Savollar tartibi foydalanuvchiga bog'liq
+    cache_namespaces = ('tests',)
+    cache_per_user = True
     queryset = Test.objects.all()
     serializer_class = TestDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        # Shuffle questions for each request
-        for test in queryset:
-            questions = list(test.questions.all())
-            random.shuffle(questions)
-            test.questions.all = lambda: questions
-        return queryset
+    def get_attempt(self, test):
+        """?attempt= faqat foydalanuvchining shu testdagi urinishi bo'lishi mumkin"""
+        value = self.request.query_params.get('attempt')
+        if not value:
+            return None
+        try:
+            attempt_id = uuid.UUID(value)
+        except ValueError:
+            raise Http404
+        # Begona yoki o'ylab topilgan id bilan bankni qayta tanlab bo'lmasligi uchun 404
+        return get_object_or_404(
+            TestAttempt.objects.only('id', 'question_ids'),
+            pk=attempt_id, user=self.request.user, test=test
+        )
+
+    def get_question_seed(self):
+        attempt = getattr(self, 'attempt', None)
+        return question_seed(self.request.user.pk, self.kwargs['pk'], attempt.pk if attempt else None)
+
+    def get_object(self):
+        test = super().get_object()
+        # Bank rejimida faqat urinishga tanlangan savollar yuklanadi
+        self.attempt = self.get_attempt(test)
+        if self.attempt is not None:
+            question_ids = self.attempt.question_ids
+        else:
+            question_ids = sample_questions(test, self.get_question_seed())
+        questions = Question.objects.prefetch_related('options')
+        if question_ids:
+            questions = questions.filter(id__in=question_ids)
+        # Prefetch faqat so'ralgan testning savollari uchun bajariladi
+        prefetch_related_objects([test], Prefetch('questions', queryset=questions))
+        return test
+
+    def get_serializer_context(self):
+        # Savollar tartibi foydalanuvchi va urinishga bog'liq, qayta yuklanganda o'zgarmaydi
+        context = super().get_serializer_context()
+        context['question_seed'] = self.get_question_seed()
+        return context
 
 class TestSubmitView(generics.CreateAPIView):
+    """
+    Testni topshirish: javoblar {question_id: 'A'} yoki
+    [{"question_id": ..., "option_id": ...}] ko'rinishida.
+
+    Savol va variantlar testga tegishliligi keshdagi kalit bo'yicha to'plam
+    sifatida tekshiriladi, baholash Celery'da bajariladi.
+    """
     serializer_class = TestSubmitSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_serializer_class(self):
+        if isinstance(self.request.data.get('answers'), list):
+            return TestOptionSubmitSerializer
+        return self.serializer_class
+
+    def get_answers(self, serializer):
+        """{question_id: javob}; takrorlangan savol uchun ValidationError"""
+        answers = serializer.validated_data['answers']
+        if isinstance(answers, dict):
+            return {str(question_id): answer for question_id, answer in answers.items()}
+        selected = {}
+        for answer in answers:
+            question_id = str(answer['question_id'])
+            if question_id in selected:
+                raise ValidationError({'answers': [f'Savol takrorlangan: {question_id}']})
+            selected[question_id] = answer['option_id']
+        return selected
+
     def create(self, request, *args, **kwargs):
         test = get_object_or_404(Test, pk=kwargs['pk'])
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        
-        answers = serializer.validated_data['answers']
-        questions = test.questions.all()
-        
-        # Calculate score
-        correct_answers = 0
-        total_questions = questions.count()
-        
-        for question in questions:
-            if str(question.id) in answers and answers[str(question.id)] == question.correct_option:
-                correct_answers += 1
-        
-        score = int((correct_answers / total_questions) * 100)
-        
-        # Create test result
+        answers = self.get_answers(serializer)
+
+        answer_key = get_answer_key(test.pk)
+        question_ids = sample_questions(test, question_seed(request.user.pk, test.pk))
+        allowed = set(question_ids) if question_ids else answer_key['answers']
+        unknown = [question_id for question_id in answers if question_id not in allowed]
+        if unknown:
+            return Response(
+                {'answers': [f"Savol noto'g'ri: {question_id}" for question_id in unknown]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Variant id'si savolga tegishli bo'lishi kerak (harflar correct_option bo'yicha baholanadi)
+        invalid = [
+            option_id for question_id, option_id in answers.items()
+            if isinstance(option_id, int) and option_id not in answer_key['options'].get(question_id, ())
+        ]
+        if invalid:
+            return Response(
+                {'answers': [f"Variant noto'g'ri: {option_id}" for option_id in invalid]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Natija 'pending' holatida yaratiladi, baholash Celery'da bajariladi
         result = TestResult.objects.create(
             user=request.user,
             test=test,
-            score=score
+            submitted_answers=answers,
+            question_ids=question_ids
         )
         
         return Response({
-            'score': score,
-            'total': total_questions,
-            'correct': correct_answers,
-            'message': self._get_message(score)
-        }, status=status.HTTP_201_CREATED)
-    
-    def _get_message(self, score):
-        if score >= 90:
-            return "Ajoyib natija!"
-        elif score >= 80:
-            return "Yaxshi natija!"
-        elif score >= 70:
-            return "Yaxshi!"
-        elif score >= 60:
-            return "Qoniqarli!"
-        else:
-            return "Qayta urinib ko'ring!"
+            'id': result.id,
+            'status': result.status
+        }, status=status.HTTP_202_ACCEPTED)
 
-class TestResultListView(generics.ListAPIView):
+class TestAttemptStartView(generics.CreateAPIView):
+    """Test urinishini boshlash (faol urinish bo'lsa o'shani qaytaradi)"""
+    serializer_class = TestAttemptSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        test = get_object_or_404(Test, pk=kwargs['pk'], is_active=True)
+        attempt, created = start_attempt(request.user, test)
+        return Response(
+            self.get_serializer(attempt).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+class TestAttemptDetailView(generics.RetrieveAPIView):
+    """Urinish holati va avtosaqlangan javoblar"""
+    serializer_class = TestAttemptSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return TestAttempt.objects.filter(user=self.request.user).select_related('result')
+
+class TestAttemptAnswersView(TestAttemptDetailView):
+    """Javoblarni avtosaqlash (faqat buferga yoziladi)"""
+
+    def patch(self, request, *args, **kwargs):
+        attempt = self.get_object()
+        serializer = TestSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            saved = save_answers(attempt, serializer.validated_data['answers'])
+        except AttemptClosed:
+            return Response(
+                {'detail': 'Urinish yakunlangan yoki vaqt tugagan'},
+                status=status.HTTP_409_CONFLICT
+            )
+        except ValueError as exc:
+            return Response(
+                {'detail': "Savollar bu testga tegishli emas", 'questions': exc.args[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({
+            'saved': saved,
+            'remaining_seconds': max(int((attempt.deadline - timezone.now()).total_seconds()), 0)
+        })
+
+class TestAttemptSubmitView(TestAttemptDetailView):
+    """Urinishni yakunlash: buferdagi javoblar baholanadi"""
+
+    def post(self, request, *args, **kwargs):
+        attempt = finalize_attempt(self.get_object().pk)
+        return Response(self.get_serializer(attempt).data)
+
+class LeaderboardView(generics.GenericAPIView):
+    """Umumiy reyting: top-K va foydalanuvchi o'rni"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_leaderboard_key(self):
+        return GLOBAL_KEY
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            limit = 10
+        return Response(get_leaderboard(self.get_leaderboard_key(), request.user, limit))
+
+class TestLeaderboardView(LeaderboardView):
+    """Test reytingi"""
+
+    def get_leaderboard_key(self):
+        return test_key(self.kwargs['pk'])
+
+class QuestionImportView(generics.GenericAPIView):
+    """CSV yoki JSON-lines fayldan savollarni ommaviy import qilish"""
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        test = get_object_or_404(Test, pk=kwargs['pk'])
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'Fayl yuklanmagan'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fmt = request.data.get('format') or detect_format(upload.name)
+        if fmt not in FORMATS:
+            return Response(
+                {'detail': "Fayl formati csv yoki jsonl bo'lishi kerak"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report = import_questions(test, upload.file, fmt)
+        return Response(
+            report,
+            status=status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST
+        )
+
+class TestStatisticView(generics.RetrieveAPIView):
+    """Savollar tahlili (faqat adminlar uchun)"""
+    serializer_class = TestStatisticSerializer
+    permission_classes = [permissions.IsAdminUser]
+    lookup_field = 'test_id'
+    lookup_url_kwarg = 'pk'
+
+    def get_queryset(self):
+        return TestStatistic.objects.prefetch_related(
+            Prefetch(
+                'test__question_statistics',
+                queryset=QuestionStatistic.objects.select_related('question').order_by('difficulty')
+            )
+        )
+
+class TestResultDetailView(generics.RetrieveAPIView):
+    """Natija holati: baholash tugaguncha so'rab turish uchun"""
     serializer_class = TestResultSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return TestResult.objects.filter(user=self.request.user)
+        return TestResult.objects.filter(user=self.request.user).select_related('test').prefetch_related(
+            'answers__question__options', 'answers__selected_option'
+        )
+
+class TestResultListView(generics.ListAPIView):
+    serializer_class = TestResultListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CompletedAtCursorPagination
+
+    def get_queryset(self):
+        # Javoblar tahlili faqat detail'da: sahifadagi testlar savollar soni bilan bitta so'rovda
+        return TestResult.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('test', queryset=Test.objects.annotate(questions_total=Count('questions')))
+        )
 
 class QuestionCreateView(generics.CreateAPIView):
     queryset = Question.objects.all()
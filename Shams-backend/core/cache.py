@@ -0,0 +1,178 @@
+"""
+Versiyalangan kesh.
+
+Har bir nom maydoni (namespace) uchun keshda versiya saqlanadi va kalitlar
+shu versiyalardan yasaladi. Invalidatsiya bitta atomar INCR: eski kalitlar
+shunchaki o'qilmay qoladi va timeout bilan o'chib ketadi. Bu delete_pattern'ga
+muhtoj emas, shuning uchun LocMem'da ham ishlaydi. Versiyalar ETag uchun,
+alohida saqlanadigan o'zgarish vaqti esa Last-Modified uchun asos bo'ladi.
+"""
+import hashlib
+import math
+import time
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+VERSION_KEY = 'ns:{}'
+MODIFIED_KEY = 'ns:{}:modified'
+
+
+def user_namespace(prefix, user_id):
+    """Foydalanuvchiga tegishli nom maydoni"""
+    return f'{prefix}:{user_id or "anon"}'
+
+
+def get_namespace_versions(namespaces):
+    """Nom maydonlari versiyalarini bitta so'rovda olish"""
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Versiya yo'qolgan bo'lsa (eviction), eski kalitlar bilan to'qnashmaydigan yangi qiymat
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_namespace_modified(namespaces):
+    """Nom maydonlari oxirgi o'zgargan vaqti (sekundlarda)"""
+    keys = [MODIFIED_KEY.format(namespace) for namespace in namespaces]
+    modified = cache.get_many(keys)
+    for key in keys:
+        if key not in modified:
+            cache.add(key, time.time(), None)
+            modified[key] = cache.get(key)
+    return [modified[key] for key in keys]
+
+
+def bump_namespace(*namespaces):
+    """Nom maydonidagi barcha kalitlarni eskirgan deb belgilash"""
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        # add versiya yo'q bo'lsagina yozadi, incr esa parallel chaqiruvlarda ham atomar
+        cache.add(key, time.time_ns(), None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+        cache.set(MODIFIED_KEY.format(namespace), time.time(), None)
+
+
+def versioned_key(namespaces, *parts):
+    """Nom maydonlari versiyalari va qo'shimcha qismlardan kesh kaliti yasash"""
+    versions = get_namespace_versions(namespaces)
+    stamp = '.'.join(f'{namespace}@{version}' for namespace, version in zip(namespaces, versions))
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'catalog:{stamp}:{digest}'
+
+
+def get_validators(namespaces, *parts):
+    """Nom maydonlari versiyalaridan (ETag, Last-Modified) yasash - bazaga murojaatsiz"""
+    versions = get_namespace_versions(namespaces)
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in [*versions, *parts]).encode()
+    ).hexdigest()
+    # Sekundgacha yuqoriga yaxlitlanadi, aks holda shu sekunddagi o'zgarish eskiroq ko'rinadi
+    return quote_etag(digest), math.ceil(max(get_namespace_modified(namespaces)))
+
+
+def not_modified(request, etag, last_modified):
+    """
+    If-None-Match mos kelsa 304 javobini qaytarish.
+
+    Last-Modified sekund aniqligida, shuning uchun If-Modified-Since bir sekund
+    ichidagi o'zgarishni ko'rmaydi: 304 faqat ETag bo'yicha beriladi.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified, per_user=False):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if per_user:
+        patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+class NamespaceMixin:
+    """
+    cache_namespaces - javob bog'liq bo'lgan nom maydonlari,
+    cache_user_namespace - javobda foydalanuvchiga xos maydonlar bo'lsa prefiks.
+    """
+    cache_namespaces = ()
+    cache_user_namespace = None
+
+    def get_cache_namespaces(self):
+        namespaces = list(self.cache_namespaces)
+        if self.cache_user_namespace:
+            namespaces.append(user_namespace(self.cache_user_namespace, self.request.user.pk))
+        return namespaces
+
+    def get_cache_parts(self, request):
+        # Generic view'larda action bo'lmaydi, sinf nomi yetarli
+        return [self.__class__.__name__, getattr(self, 'action', None), request.user.is_staff, request.get_full_path()]
+
+
+class ConditionalGetMixin(NamespaceMixin):
+    """
+    list/retrieve uchun ETag va Last-Modified.
+
+    Validatorlar versiyalardan olinadi, shuning uchun 304 javobi na bazaga,
+    na serializatsiyaga murojaat qiladi. cache_per_user - javob foydalanuvchiga
+    bog'liq, lekin unga alohida nom maydoni kerak bo'lmasa.
+    """
+    cache_per_user = False
+
+    def get_cache_parts(self, request):
+        parts = super().get_cache_parts(request)
+        if self.cache_per_user:
+            parts.append(request.user.pk)
+        return parts
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = get_validators(self.get_cache_namespaces(), *self.get_cache_parts(request))
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            per_user = self.cache_per_user or bool(self.cache_user_namespace)
+            set_validators(response, etag, last_modified, per_user=per_user)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+
+class CatalogCacheMixin(NamespaceMixin):
+    """ViewSet'ning list/retrieve javoblarini keshlash"""
+    cache_timeout = 60 * 10
+
+    def get_cache_key(self, request):
+        return versioned_key(self.get_cache_namespaces(), *self.get_cache_parts(request))
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,193 @@
+"""
+Tezkor kalit-qiymat ombori.
+
+REDIS_URL sozlangan bo'lsa Redis ishlatiladi, aks holda (dev va testlarda)
+bitta jarayon ichida ishlaydigan MemoryStore.
+"""
+import threading
+from django.conf import settings
+
+
+class MemoryStore:
+    """Redis o'rniga jarayon ichidagi ombor"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def hset(self, key, mapping):
+        with self._lock:
+            self._data.setdefault(key, {}).update(
+                {str(field): str(value) for field, value in mapping.items()}
+            )
+
+    def hsetnx(self, key, mapping):
+        with self._lock:
+            bucket = self._data.setdefault(key, {})
+            for field, value in mapping.items():
+                bucket.setdefault(str(field), str(value))
+
+    def hincrby(self, key, field, amount=1):
+        with self._lock:
+            bucket = self._data.setdefault(key, {})
+            value = int(bucket.get(str(field), 0)) + amount
+            bucket[str(field)] = str(value)
+            return value
+
+    def hmget(self, key, fields):
+        with self._lock:
+            bucket = self._data.get(key, {})
+            return [bucket.get(str(field)) for field in fields]
+
+    def hgetall(self, key):
+        with self._lock:
+            return dict(self._data.get(key, {}))
+
+    def hpopall(self, key):
+        with self._lock:
+            return self._data.pop(key, {})
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    # Sorted set'lar: {member: score} lug'ati. Reyting O(n log n) - faqat dev va testlar uchun
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            zset = self._data.setdefault(key, {})
+            for member, score in mapping.items():
+                zset[str(member)] = float(score)
+
+    def zadd_best(self, key, total_key, member, score):
+        with self._lock:
+            zset = self._data.setdefault(key, {})
+            previous = zset.get(str(member))
+            if previous is not None and previous >= score:
+                return 0.0
+            zset[str(member)] = float(score)
+            totals = self._data.setdefault(total_key, {})
+            delta = score - (previous or 0.0)
+            totals[str(member)] = totals.get(str(member), 0.0) + delta
+            return delta
+
+    def zincrby(self, key, member, amount):
+        with self._lock:
+            zset = self._data.setdefault(key, {})
+            zset[str(member)] = zset.get(str(member), 0.0) + amount
+            return zset[str(member)]
+
+    def zscore(self, key, member):
+        with self._lock:
+            return self._data.get(key, {}).get(str(member))
+
+    def _zrevsorted(self, key):
+        # Redis kabi: ball kamayishi, teng ballda a'zo nomi kamayishi bo'yicha
+        return sorted(self._data.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+
+    def zrevrange(self, key, start, stop):
+        with self._lock:
+            items = self._zrevsorted(key)
+        return items[start:None if stop == -1 else stop + 1]
+
+    def zrevrank(self, key, member):
+        with self._lock:
+            if str(member) not in self._data.get(key, {}):
+                return None
+            members = [item[0] for item in self._zrevsorted(key)]
+        return members.index(str(member))
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._data.get(key, {}))
+
+
+# Ball oshgan bo'lsa yangilash va farqni yig'indi set'iga qo'shish - bitta atomar qadam
+ZADD_BEST_SCRIPT = """
+local previous = redis.call('ZSCORE', KEYS[1], ARGV[1])
+local score = tonumber(ARGV[2])
+if previous and tonumber(previous) >= score then
+    return '0'
+end
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+local delta = score - (tonumber(previous) or 0)
+redis.call('ZINCRBY', KEYS[2], delta, ARGV[1])
+return tostring(delta)
+"""
+
+
+class RedisStore:
+    """Redis ombori"""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._zadd_best = self.client.register_script(ZADD_BEST_SCRIPT)
+
+    def hset(self, key, mapping):
+        self.client.hset(key, mapping=mapping)
+
+    def hsetnx(self, key, mapping):
+        # Faqat mavjud bo'lmagan maydonlar yoziladi
+        pipe = self.client.pipeline()
+        for field, value in mapping.items():
+            pipe.hsetnx(key, field, value)
+        pipe.execute()
+
+    def hincrby(self, key, field, amount=1):
+        return self.client.hincrby(key, field, amount)
+
+    def hmget(self, key, fields):
+        return self.client.hmget(key, [str(field) for field in fields])
+
+    def hgetall(self, key):
+        return self.client.hgetall(key)
+
+    def hpopall(self, key):
+        # HGETALL va DEL bitta MULTI ichida - oraliqda kelgan yozuvlar yo'qolmaydi
+        pipe = self.client.pipeline()
+        pipe.hgetall(key)
+        pipe.delete(key)
+        data, _ = pipe.execute()
+        return data
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def zadd(self, key, mapping):
+        self.client.zadd(key, mapping)
+
+    def zadd_best(self, key, total_key, member, score):
+        return float(self._zadd_best(keys=[key, total_key], args=[member, score]))
+
+    def zincrby(self, key, member, amount):
+        return self.client.zincrby(key, amount, member)
+
+    def zscore(self, key, member):
+        return self.client.zscore(key, member)
+
+    def zrevrange(self, key, start, stop):
+        return self.client.zrevrange(key, start, stop, withscores=True)
+
+    def zrevrank(self, key, member):
+        return self.client.zrevrank(key, member)
+
+    def zcard(self, key):
+        return self.client.zcard(key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Sozlamalarga mos omborni qaytarish"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.REDIS_URL:
+                    _store = RedisStore(settings.REDIS_URL)
+                else:
+                    _store = MemoryStore()
+    return _store
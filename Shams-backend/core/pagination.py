@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Kursor (keyset) paginatsiya.
+
+    PageNumberPagination'dan farqli ravishda COUNT(*) va OFFSET ishlatmaydi,
+    shuning uchun sahifa qanchalik chuqur bo'lmasin narxi bir xil.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class CompletedAtCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-completed_at', '-id')
@@ -258,6 +258,24 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 # Redis settings
 REDIS_URL = os.getenv('REDIS_URL')
 
+# Cache settings
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Celery settings
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
@@ -265,6 +283,36 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-lesson-heartbeats': {
+        'task': 'apps.courses.tasks.flush_lesson_heartbeats',
+        'schedule': 30.0,
+    },
+    'finalize-expired-test-attempts': {
+        'task': 'apps.tests.tasks.finalize_expired_attempts',
+        'schedule': 60.0,
+    },
+    'refresh-test-item-statistics': {
+        'task': 'apps.tests.tasks.refresh_item_statistics',
+        'schedule': 60.0 * 60,
+    },
+    'flush-book-download-counts': {
+        'task': 'apps.library.tasks.flush_book_download_counts',
+        'schedule': 60.0,
+    },
+}
+
+# Test feedback generator: callable(result, correct, total, missed_by_difficulty) -> str
+TEST_FEEDBACK_GENERATOR = os.getenv('TEST_FEEDBACK_GENERATOR', 'apps.tests.feedback.generate_feedback')
+
+# Library file delivery: '' (Django streams the file), 'nginx' (X-Accel-Redirect) or 'apache' (X-Sendfile)
+LIBRARY_FILE_OFFLOAD = os.getenv('LIBRARY_FILE_OFFLOAD', '')
+LIBRARY_ACCEL_REDIRECT_PREFIX = os.getenv('LIBRARY_ACCEL_REDIRECT_PREFIX', '/protected/')
+# Book preview pipeline: pages copied into preview_file and cover thumbnail widths
+LIBRARY_PREVIEW_PAGES = int(os.getenv('LIBRARY_PREVIEW_PAGES', 10))
+LIBRARY_THUMBNAIL_SIZES = {'small': 160, 'medium': 320, 'large': 640}
+# Lifetime of signed book download links, in seconds
+LIBRARY_SIGNED_URL_TTL = int(os.getenv('LIBRARY_SIGNED_URL_TTL', 300))
 
 # Cloudinary settings
 CLOUDINARY = {
@@ -37,6 +37,9 @@ urlpatterns = [
     path('api/chatbot/', include('apps.chatbot.urls')),
 ]
 
+# Faqat development uchun. Productionda MEDIA_ROOT (ayniqsa books/) veb-server orqali
+# ochiq berilmasligi kerak: kitob fayllari faqat imzolangan havola yoki
+# X-Accel-Redirect/X-Sendfile (internal location) orqali uzatiladi
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)